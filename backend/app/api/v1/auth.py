@@ -2,17 +2,20 @@
 Authentication API routes
 """
 
+import asyncio
+import hmac
 import logging
 from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.security import HTTPAuthorizationCredentials, OAuth2PasswordRequestForm
+from fastapi.responses import ORJSONResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordRequestForm
+from jose import JWTError, jwt
 from pydantic import BaseModel
 
 from app.core.auth import (
     create_tokens_for_user, 
-    verify_token, 
-    get_current_user,
+    get_cached_token_payload, 
     get_current_active_user,
     security,
     create_access_token
@@ -25,99 +28,93 @@ from app.models.user import (
     TokenData,
     UserInDB
 )
-from app.services.user_service import user_service
+from app.services.user_service import user_service, _dev_users
 from app.schemas.auth import TokenResponse
 from app.schemas.base import BaseResponse
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["Authentication"])
+# Token payloads are rendered with orjson rather than the stdlib encoder
+router = APIRouter(tags=["Authentication"], default_response_class=ORJSONResponse)
+
+# Bearer scheme for endpoints where a token is optional and never verified
+optional_security = HTTPBearer(auto_error=False)
+
+# Credentials accepted by the mock /token endpoint
+_MOCK_TOKEN_USERNAME = b"admin"
+_MOCK_TOKEN_PASSWORD = b"admin123"
+
 
 class TokenRequest(BaseModel):
     username: str
     password: str
 
 
+def _user_response(user: UserInDB) -> UserResponse:
+    """Build the public user payload from the stored user without re-running validation"""
+    # Every field was already validated when the UserInDB was loaded
+    return UserResponse.model_construct(
+        id=str(user.id),
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+        last_login=user.last_login
+    )
+
+
+async def _build_token_response(user: UserInDB) -> Token:
+    """Issue tokens for the user and assemble the Token payload"""
+    # JWT signing is CPU work; submit it to a worker thread right away (run_in_executor
+    # starts immediately, unlike a to_thread task) and build the user payload meanwhile
+    token_future = asyncio.get_running_loop().run_in_executor(None, create_tokens_for_user, user)
+    user_response = _user_response(user)
+    token_data = await token_future
+    # token_data comes from create_tokens_for_user, so it needs no re-validation
+    return Token.model_construct(**token_data, user=user_response)
+
+
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate):
     """
     Register a new user
     
     Creates a new user account with hashed password and returns JWT tokens.
+    Email, password length and full name are validated by `UserCreate` (422 on failure).
     """
     try:
-        logger.info(f"🔐 Registration attempt for: {user_data.email}")
-        logger.info(f"📝 User data received: email={user_data.email}, full_name='{user_data.full_name}', role={user_data.role}")
-        
-        # Validate input
-        if len(user_data.password) < 8:
-            logger.warning(f"⚠️ Password too short for user: {user_data.email}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Password must be at least 8 characters long"
+        logger.info("🔐 Registration attempt for: %s", user_data.email)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "📝 User data received: email=%s, full_name='%s', role=%s",
+                user_data.email, user_data.full_name, user_data.role
             )
         
-        if not user_data.email or "@" not in user_data.email:
-            logger.warning(f"⚠️ Invalid email format: {user_data.email}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Valid email address is required"
-            )
-        
-        if not user_data.full_name or len(user_data.full_name.strip()) < 2:
-            logger.warning(f"⚠️ Invalid full name: '{user_data.full_name}'")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Full name must be at least 2 characters long"
-            )
-        
-        # Check if user already exists
-        existing_user = await user_service.get_by_email(user_data.email)
-        if existing_user:
+        # Create user; the unique email index rejects duplicates in the same round trip
+        created_user, created = await user_service.create_if_absent(user_data)
+        if not created:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this email already exists"
             )
-        
-        # Create user
-        created_user = await user_service.create(user_data)
         if not created_user:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create user"
             )
         
-        # Create tokens
-        token_data = create_tokens_for_user(created_user)
-        
-        # Prepare user response
-        user_response = UserResponse(
-            id=str(created_user.id),
-            email=created_user.email,
-            full_name=created_user.full_name,
-            role=created_user.role,
-            is_active=created_user.is_active,
-            created_at=created_user.created_at,
-            updated_at=created_user.updated_at,
-            last_login=created_user.last_login
-        )
-        
-        # Create token response
-        token_response = Token(
-            access_token=token_data["access_token"],
-            refresh_token=token_data["refresh_token"],
-            token_type=token_data["token_type"],
-            expires_in=token_data["expires_in"],
-            user=user_response
-        )
+        # Sign tokens and build the token response
+        token_response = await _build_token_response(created_user)
         
-        logger.info(f"✅ User registered successfully: {user_data.email}")
+        logger.info("✅ User registered successfully: %s", user_data.email)
         return token_response
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Registration error: {e}")
+        logger.error("❌ Registration error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Registration failed"
@@ -132,65 +129,35 @@ async def login(login_data: UserLogin):
     Authenticates user with email and password and returns access + refresh tokens.
     """
     try:
-        logger.info(f"🔐 Login attempt with email: {login_data.email}")
-
-        try:
-            # Authenticate user (check password)
-            authenticated_user = await user_service.authenticate(login_data.email, login_data.password)
-            if not authenticated_user:
-                logger.warning(f"⚠️ Invalid credentials for user: {login_data.email}")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid email or password"
-                )
-
-            # Check if user is active
-            if not authenticated_user.is_active:
-                logger.warning(f"⚠️ Login attempt for inactive user: {login_data.email}")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Your account has been deactivated. Please contact support."
-                )
+        logger.info("🔐 Login attempt with email: %s", login_data.email)
 
-        except Exception as e:
-            logger.error(f"❌ Authentication error: {str(e)}")
+        # Authenticate user (check password); the service logs and absorbs driver errors
+        authenticated_user = await user_service.authenticate(login_data.email, login_data.password)
+        if not authenticated_user:
+            logger.warning("⚠️ Invalid credentials for user: %s", login_data.email)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
 
+        # Check if user is active
+        if not authenticated_user.is_active:
+            logger.warning("⚠️ Login attempt for inactive user: %s", login_data.email)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Your account has been deactivated. Please contact support."
+            )
         
-        # Create tokens
-        token_data = create_tokens_for_user(authenticated_user)
-        
-        # Prepare user response
-        user_response = UserResponse(
-            id=str(authenticated_user.id),
-            email=authenticated_user.email,
-            full_name=authenticated_user.full_name,
-            role=authenticated_user.role,
-            is_active=authenticated_user.is_active,
-            created_at=authenticated_user.created_at,
-            updated_at=authenticated_user.updated_at,
-            last_login=authenticated_user.last_login
-        )
-        
-        # Create token response
-        token_response = Token(
-            access_token=token_data["access_token"],
-            refresh_token=token_data["refresh_token"],
-            token_type=token_data["token_type"],
-            expires_in=token_data["expires_in"],
-            user=user_response
-        )
+        # Sign tokens and build the token response
+        token_response = await _build_token_response(authenticated_user)
         
-        logger.info(f"✅ User logged in successfully: {login_data.email}")
+        logger.info("✅ User logged in successfully: %s", login_data.email)
         return token_response
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Login error: {e}")
+        logger.error("❌ Login error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Login failed due to server error. Please try again."
@@ -206,52 +173,31 @@ async def refresh_token(credentials: HTTPAuthorizationCredentials = Depends(secu
     """
     try:
         # Verify refresh token
-        token_data = verify_token(credentials.credentials)
+        token_data = get_cached_token_payload(credentials.credentials)
         if not token_data:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token"
             )
         
-        # Get user from database
-        user = await user_service.get_by_id(token_data.user_id)
+        # Get user (repeat refreshes within the cache TTL skip the database)
+        user = await user_service.get_by_id_cached(token_data.user_id)
         if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found or inactive"
             )
         
-        # Create new tokens
-        new_token_data = create_tokens_for_user(user)
-        
-        # Prepare user response
-        user_response = UserResponse(
-            id=str(user.id),
-            email=user.email,
-            full_name=user.full_name,
-            role=user.role,
-            is_active=user.is_active,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-            last_login=user.last_login
-        )
-        
-        # Create token response
-        token_response = Token(
-            access_token=new_token_data["access_token"],
-            refresh_token=new_token_data["refresh_token"],
-            token_type=new_token_data["token_type"],
-            expires_in=new_token_data["expires_in"],
-            user=user_response
-        )
+        # Sign tokens and build the token response
+        token_response = await _build_token_response(user)
         
-        logger.info(f"✅ Token refreshed successfully: {user.email}")
+        logger.info("✅ Token refreshed successfully: %s", user.email)
         return token_response
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Token refresh error: {e}")
+        logger.error("❌ Token refresh error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Token refresh failed"
@@ -265,28 +211,25 @@ async def get_current_user_info(current_user: UserInDB = Depends(get_current_act
     
     Returns the current authenticated user's profile information.
     """
-    return UserResponse(
-        id=str(current_user.id),
-        email=current_user.email,
-        full_name=current_user.full_name,
-        role=current_user.role,
-        is_active=current_user.is_active,
-        created_at=current_user.created_at,
-        updated_at=current_user.updated_at,
-        last_login=current_user.last_login
-    )
+    return _user_response(current_user)
 
 
 @router.post("/logout")
-async def logout(current_user: Optional[UserInDB] = Depends(get_current_user)):
+async def logout(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
     """
     Logout user
     
     In a stateless JWT system, logout is handled client-side by removing tokens.
     This endpoint exists for consistency and future session management.
+    The token is not verified; its claims are only read for the audit log.
     """
-    if current_user:
-        logger.info(f"✅ User logged out: {current_user.email}")
+    if credentials:
+        try:
+            email = jwt.get_unverified_claims(credentials.credentials).get("email")
+        except JWTError:
+            email = None
+        if email:
+            logger.info("Logout (unverified token claim): %s", email)
     return {"message": "Successfully logged out"}
 
 
@@ -296,26 +239,24 @@ async def debug_users():
     Debug endpoint to check registered users (development only)
     """
     try:
-        from app.services.user_service import _dev_users
-        
-        users_info = []
-        for user_id, user in _dev_users.items():
-            users_info.append({
-                "id": user_id,
-                "email": user.email,
-                "full_name": user.full_name,
-                "role": user.role,
-                "is_active": user.is_active,
-                "created_at": user.created_at.isoformat()
-            })
-        
-        return {
+        # orjson serializes created_at natively, so rows go out without per-field conversion
+        return ORJSONResponse({
             "total_users": len(_dev_users),
-            "users": users_info
-        }
+            "users": [
+                {
+                    "id": user_id,
+                    "email": user.email,
+                    "full_name": user.full_name,
+                    "role": user.role,
+                    "is_active": user.is_active,
+                    "created_at": user.created_at
+                }
+                for user_id, user in _dev_users.items()
+            ]
+        })
         
     except Exception as e:
-        logger.error(f"❌ Debug users error: {e}")
+        logger.error("❌ Debug users error: %s", e)
         return {"error": str(e)}
 
 
@@ -324,7 +265,10 @@ async def create_access_token(request: TokenRequest) -> TokenResponse:
     """Create access token for authentication"""
     try:
         # Mock authentication - replace with real auth logic
-        if request.username == "admin" and request.password == "admin123":
+        # Compare in constant time and evaluate both checks so timing doesn't reveal which failed
+        username_ok = hmac.compare_digest(request.username.encode(), _MOCK_TOKEN_USERNAME)
+        password_ok = hmac.compare_digest(request.password.encode(), _MOCK_TOKEN_PASSWORD)
+        if username_ok & password_ok:
             return TokenResponse(
                 access_token="mock_jwt_token_12345",
                 token_type="bearer",
@@ -338,7 +282,7 @@ async def create_access_token(request: TokenRequest) -> TokenResponse:
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Token creation failed: {e}")
+        logger.error("❌ Token creation failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Authentication failed"
@@ -3,19 +3,101 @@
 Enhanced for frontend dashboard integration with PII Security
 """
 
+import asyncio
+import hashlib
 import logging
-import uuid
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, status
+import os
+import re
+import threading
+import orjson
+from contextlib import suppress
+from datetime import datetime, timedelta
+from enum import IntEnum
+from functools import lru_cache
+from itertools import chain
+from cachetools import LRUCache, TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional, Set, Tuple, Union
 
+from app.core.config import settings
 from app.schemas.base import BaseResponse
 from app.utils.pii_security import pii_tokenizer, create_safe_log
+from app.utils.ids import next_id
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Pattern scan results cached per message; longer messages are keyed by digest
+SCAN_CACHE_SIZE = 4096
+SCAN_CACHE_MAX_KEY_CHARS = 1024
+
+# Full analysis results cached per message and scoring context (retries, probes, bots)
+RESULT_CACHE_SIZE = 4096
+
+# Bump to invalidate serialized Hyperscan databases in RISK_PATTERN_CACHE_DIR
+HYPERSCAN_CACHE_VERSION = 1
+
+# Messages at least this long are analyzed in a worker thread; shorter ones finish
+# faster than the thread hand-off costs
+ANALYZE_IN_THREAD_MIN_CHARS = 1000
+
+_DIGIT_RE = re.compile(r"\d")
+
+# Display names for risk categories; display names map to themselves so flags
+# from analyze_content_for_dashboard pass through unchanged
+FLAG_DISPLAY: Dict[str, str] = {
+    "pii_leak": "PII Detected",
+    "adversarial": "Adversarial Intent",
+    "bias": "Bias",
+    "toxicity": "Toxicity"
+}
+FLAG_DISPLAY.update({display: display for display in list(FLAG_DISPLAY.values())})
+NONE_FLAGS = frozenset(("none", "None"))
+NO_RISK_FLAGS = ("None",)
+
+# /risk-stats responses are reused briefly to absorb dashboard polling
+_risk_stats_cache: TTLCache = TTLCache(maxsize=1, ttl=settings.RISK_STATS_CACHE_TTL_SECONDS)
+_risk_stats_lock = asyncio.Lock()
+
+# Client IP hashes are deterministic, so repeat clients reuse them
+IP_HASH_CACHE_SIZE = 4096
+
+# Output analysis result used when the response is known to carry no risk
+ZERO_RISK_RESULT: Dict[str, Any] = {"risk_score": 0, "risk_flags": NO_RISK_FLAGS, "risk_details": {}}
+
+# Chat logs are written to MongoDB in batches by a background task, and
+# risk_logs is projected from chat_logs by another
+_chat_log_queue: Optional[asyncio.Queue] = None
+_chat_log_writer: Optional[asyncio.Task] = None
+_risk_log_projector: Optional[asyncio.Task] = None
+
+# Each risk log projection re-reads this much of the previous window
+RISK_LOG_PROJECTION_OVERLAP_SECONDS = 60
+# Consecutive projection failures back off exponentially up to this delay
+RISK_LOG_PROJECTION_MAX_BACKOFF_SECONDS = 300
+
 # AIRMS System Prompt for Dynamic Risk Analysis
 AIRMS_SYSTEM_PROMPT = """
 You are AIRMS (AI Risk Management Assistant), an advanced AI safety and risk detection system.
@@ -83,10 +165,105 @@ class ChatResponse(BaseModel):
     risk_analysis: RiskAnalysis
     session_metadata: Dict[str, Any] = Field(default_factory=dict)
 
+def _required_literal(pattern: str) -> Optional[str]:
+    """Return the longest literal run every match of pattern must contain (lowercased)"""
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return None
+    
+    # Only top-level literals are mandatory; groups, branches and repeats may be skipped
+    longest, run = "", []
+    for op, arg in list(parsed) + [(None, None)]:
+        if op == sre_parse.LITERAL:
+            run.append(chr(arg))
+            continue
+        if len(run) > len(longest):
+            longest = "".join(run)
+        run = []
+    return longest.lower() or None
+
+class PiiKind(IntEnum):
+    """PII type each pii_leak pattern detects; indexes EnhancedRiskAnalyzer._pii_points"""
+    EMAIL = 0
+    PHONE = 1
+    AADHAAR = 2
+    PAN = 3
+    CREDIT_CARD = 4
+    SSN = 5
+    ADDRESS = 6
+    BANK_ACCOUNT = 7
+    DISCLOSURE = 8
+    POSTAL_CODE = 9
+
+def _collect_hyperscan_match(pattern_id, start, end, flags, context):
+    """Hyperscan match callback: record which pattern fired"""
+    context.add(pattern_id)
+
 # Enhanced risk analyzer (same as before but with additional metadata)
 class EnhancedRiskAnalyzer:
     """Enhanced risk analyzer with dashboard-focused output"""
     
+    # PII kinds whose patterns can only match text containing a digit
+    DIGIT_PII_KINDS = frozenset({
+        PiiKind.PHONE, PiiKind.AADHAAR, PiiKind.PAN, PiiKind.CREDIT_CARD,
+        PiiKind.SSN, PiiKind.ADDRESS, PiiKind.BANK_ACCOUNT, PiiKind.POSTAL_CODE
+    })
+    
+    # Score (clamped to 0-100) -> label lookup tables
+    RISK_LEVEL_BY_SCORE = ("SAFE",) + ("LOW",) * 25 + ("MEDIUM",) * 25 + ("HIGH",) * 25 + ("CRITICAL",) * 25
+    SEVERITY_BY_SCORE = ("low",) * 25 + ("medium",) * 25 + ("high",) * 25 + ("critical",) * 26
+    
+    RISK_DESCRIPTIONS = {
+        "bias": "Potential bias or discrimination detected",
+        "pii_leak": "Personal information exposure risk",
+        "adversarial": "Adversarial or prompt injection attempt",
+        "toxicity": "Toxic or harmful language detected"
+    }
+    
+    REQUIRED_ACTIONS = {
+        "SAFE": "continue_normally",
+        "LOW": "log_and_monitor",
+        "MEDIUM": "review_recommended",
+        "HIGH": "manual_review_required",
+        "CRITICAL": "block_and_escalate"
+    }
+    
+    # Keyed by the display flags analyze_content_for_dashboard puts in risk_flags
+    FLAG_RECOMMENDATIONS = {
+        "PII Detected": (
+            "Remove personal information from message",
+            "Use anonymized examples instead",
+            "Check privacy settings"
+        ),
+        "Bias": (
+            "Rephrase using inclusive language",
+            "Avoid generalizations about groups",
+            "Consider alternative perspectives"
+        ),
+        "Adversarial Intent": (
+            "Rephrase request without manipulation attempts",
+            "Use direct, clear questions",
+            "Follow platform guidelines"
+        ),
+        "Toxicity": (
+            "Use respectful language",
+            "Focus on constructive discussion",
+            "Consider the impact of your words"
+        )
+    }
+    
+    # Keywords in the message that select a scoring bucket in _calculate_deterministic_score
+    SCORING_KEYWORDS = {
+        # Bias
+        "hate_speech": ("terrorists", "can't be trusted", "inferior", "shouldn't get"),
+        "discrimination": ("bad at programming", "useless", "should retire", "are stupid"),
+        # Toxicity
+        "threats": ("kill yourself", "destroy them all", "hate everyone"),
+        "harassment": ("stupid idiot", "hate", "terrible"),
+        "profanity": ("fuck", "shit", "damn")
+    }
+    
     def __init__(self):
         # Deterministic risk scoring weights
         self.risk_scoring = {
@@ -100,7 +277,9 @@ class EnhancedRiskAnalyzer:
                     "credit_card": 60,  # +60 points per credit card (higher for test requirements)
                     "ssn": 50,          # +50 points per SSN
                     "address": 25,      # +25 points per address
-                    "bank_account": 50  # +50 points per bank account
+                    "bank_account": 50, # +50 points per bank account
+                    "disclosure": 30,   # +30 points per explicit "my email/phone/... is" statement
+                    "postal_code": 20   # +20 points per postal code
                 }
             },
             "adversarial_intent": {
@@ -153,6 +332,24 @@ class EnhancedRiskAnalyzer:
                     # Indian postal codes
                     r'\b\d{6}\b'
                 ],
+                # PII type of each pattern above, in the same order
+                "kinds": [
+                    PiiKind.EMAIL,
+                    PiiKind.PHONE,
+                    PiiKind.PHONE,
+                    PiiKind.AADHAAR,
+                    PiiKind.AADHAAR,
+                    PiiKind.PAN,
+                    PiiKind.PAN,
+                    PiiKind.CREDIT_CARD,
+                    PiiKind.CREDIT_CARD,
+                    PiiKind.SSN,
+                    PiiKind.BANK_ACCOUNT,
+                    PiiKind.DISCLOSURE,
+                    PiiKind.DISCLOSURE,
+                    PiiKind.ADDRESS,
+                    PiiKind.POSTAL_CODE
+                ],
                 "base_weight": 30,
                 "color": "#FF1744",  # Red for PII
                 "icon": "🔒"
@@ -273,66 +470,409 @@ class EnhancedRiskAnalyzer:
             "HIGH": {"color": "#F44336", "icon": "🚨", "bg": "#FFEBEE"},
             "CRITICAL": {"color": "#D32F2F", "icon": "🚫", "bg": "#FFCDD2"}
         }
+        
+        # Stable ids for every pattern, in category order
+        self._pattern_ids = {}
+        next_id = 0
+        for risk_type, config in self.risk_patterns.items():
+            self._pattern_ids[risk_type] = range(next_id, next_id + len(config["patterns"]))
+            next_id += len(config["patterns"])
+        
+        self._re2_options = None
+        if re2 is not None:
+            self._re2_options = re2.Options()
+            self._re2_options.case_sensitive = False
+            self._re2_options.log_errors = False
+        
+        # Compile once up front; invalid patterns are dropped here instead of per call.
+        # Each pattern also gets a linear-time RE2 twin when google-re2 supports it.
+        # PII patterns carry their PiiKind so scoring is a tuple lookup
+        self.compiled_patterns = {}
+        for risk_type, config in self.risk_patterns.items():
+            kinds = config.get("kinds") or [None] * len(config["patterns"])
+            if len(kinds) != len(config["patterns"]):
+                raise ValueError(f"{risk_type} needs one kind per pattern")
+            compiled = []
+            for pattern_id, pattern, kind in zip(self._pattern_ids[risk_type], config["patterns"], kinds):
+                try:
+                    regex = re.compile(pattern, re.IGNORECASE)
+                except re.error as e:
+                    logger.warning(f"⚠️ Dropping invalid regex pattern: {pattern} - {e}")
+                    continue
+                compiled.append((pattern_id, regex, self._compile_re2(pattern), kind))
+            self.compiled_patterns[risk_type] = compiled
+        
+        self._digit_pattern_ids = frozenset(
+            pattern_id
+            for compiled in self.compiled_patterns.values()
+            for pattern_id, _, _, kind in compiled
+            if kind in self.DIGIT_PII_KINDS
+        )
+        
+        pii_multipliers = self.risk_scoring["pii_detection"]["multipliers"]
+        self._pii_points = tuple(pii_multipliers[kind.name.lower()] for kind in PiiKind)
+        
+        self._hs_db = None
+        self._hs_always_run = set()
+        self._hs_local = threading.local()
+        if hyperscan is not None:
+            self._build_hyperscan_db()
+        
+        self._re2_set = None
+        self._re2_set_ids = {}
+        self._re2_always_run = set()
+        if self._hs_db is None and re2 is not None:
+            self._build_re2_set()
+        
+        self._literal_automaton = None
+        self._literal_always_run = set()
+        if self._hs_db is None and self._re2_set is None and ahocorasick is not None:
+            self._build_literal_automaton()
+        
+        # One keyword -> buckets index for the scoring heuristics, scanned in a single pass
+        self._keyword_buckets = {}
+        for bucket, keywords in self.SCORING_KEYWORDS.items():
+            for keyword in keywords:
+                self._keyword_buckets.setdefault(keyword, []).append(bucket)
+        self._keyword_automaton = None
+        if ahocorasick is not None:
+            self._keyword_automaton = ahocorasick.Automaton()
+            for keyword, buckets in self._keyword_buckets.items():
+                self._keyword_automaton.add_word(keyword, tuple(buckets))
+            self._keyword_automaton.make_automaton()
+        
+        # Invariant part of the result for content no pattern matches
+        self._safe_result_template = {
+            "risk_score": 0,
+            "risk_level": "SAFE",
+            "confidence": 0.7,
+            "action_required": self._get_required_action("SAFE", []),
+            "display_config": self.risk_level_config["SAFE"]
+        }
+        
+        self._scan_cache = LRUCache(maxsize=SCAN_CACHE_SIZE)
+        self._result_cache = LRUCache(maxsize=RESULT_CACHE_SIZE)
+        self._scan_cache_lock = threading.Lock()
+    
+    def _compile_re2(self, pattern: str):
+        """Compile pattern with RE2, or return None if unavailable or unsupported"""
+        if self._re2_options is None:
+            return None
+        try:
+            return re2.compile(pattern, self._re2_options)
+        except re2.error:
+            return None
+    
+    def _build_hyperscan_db(self):
+        """Compile all patterns into one Hyperscan block-mode database.
+        
+        The database is only used as a prefilter: a single linear scan tells us
+        which patterns can match, and just those are run through ``re`` to keep
+        the exact ``findall`` counts the scoring relies on.
+        """
+        flags = (
+            hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+            | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_PREFILTER
+        )
+        expressions, ids = [], []
+        for risk_type, config in self.risk_patterns.items():
+            for pattern_id, pattern in zip(self._pattern_ids[risk_type], config["patterns"]):
+                expressions.append(pattern.encode("utf-8"))
+                ids.append(pattern_id)
+        
+        # Workers share a serialized database so only the first one pays the compile
+        cache_path = self._hyperscan_cache_path(expressions, ids, flags)
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    self._hs_db = hyperscan.loadb(f.read(), hyperscan.HS_MODE_BLOCK)
+                logger.info(f"✅ Hyperscan prefilter loaded from {cache_path}")
+                return
+            except (OSError, hyperscan.error) as e:
+                logger.warning(f"⚠️ Ignoring unusable Hyperscan cache {cache_path}: {e}")
+        
+        try:
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            db.compile(expressions=expressions, ids=ids, elements=len(expressions), flags=[flags] * len(expressions))
+        except hyperscan.error:
+            self._build_partial_hyperscan_db(expressions, ids, flags)
+            return
+        
+        self._hs_db = db
+        logger.info(f"✅ Hyperscan prefilter compiled for {len(expressions)} risk patterns")
+        if cache_path:
+            self._save_hyperscan_db(db, cache_path)
     
-    def analyze_content_for_dashboard(self, content: str, user_context: Dict[str, Any] = None):
-        """Analyze content with deterministic risk scoring and dashboard-specific formatting"""
-        import re
+    def _build_partial_hyperscan_db(self, expressions: List[bytes], ids: List[int], flags: int):
+        """Compile the patterns Hyperscan accepts; the rest are always run through re"""
+        accepted = []
+        for expression, pattern_id in zip(expressions, ids):
+            try:
+                hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK).compile(
+                    expressions=[expression], ids=[pattern_id], elements=1, flags=[flags]
+                )
+                accepted.append((expression, pattern_id))
+            except hyperscan.error as e:
+                logger.warning(f"⚠️ Pattern not supported by Hyperscan, scanning with re: {expression!r} - {e}")
+                self._hs_always_run.add(pattern_id)
+        
+        if not accepted:
+            self._hs_always_run = set()
+            return
         
+        try:
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            db.compile(
+                expressions=[expression for expression, _ in accepted],
+                ids=[pattern_id for _, pattern_id in accepted],
+                elements=len(accepted),
+                flags=[flags] * len(accepted)
+            )
+            self._hs_db = db
+            logger.info(f"✅ Hyperscan prefilter compiled for {len(accepted)} risk patterns")
+        except hyperscan.error as e:
+            logger.warning(f"⚠️ Hyperscan prefilter unavailable, scanning every pattern with re: {e}")
+            self._hs_always_run = set()
+    
+    def _hyperscan_cache_path(self, expressions: List[bytes], ids: List[int], flags: int) -> Optional[str]:
+        """Path of the serialized database for this exact pattern set, if caching is enabled"""
+        if not settings.RISK_PATTERN_CACHE_DIR:
+            return None
+        digest = hashlib.sha256(f"{HYPERSCAN_CACHE_VERSION}:{hyperscan.__version__}:{flags}".encode("utf-8"))
+        for expression, pattern_id in zip(expressions, ids):
+            digest.update(f"\0{pattern_id}:".encode("utf-8") + expression)
+        return os.path.join(settings.RISK_PATTERN_CACHE_DIR, f"patterns-{digest.hexdigest()}.hsdb")
+    
+    def _save_hyperscan_db(self, db, cache_path: str):
+        """Write the serialized database atomically so concurrent workers never read a partial file"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(hyperscan.dumpb(db))
+            os.replace(tmp_path, cache_path)
+            logger.info(f"✅ Hyperscan prefilter cached at {cache_path}")
+        except (OSError, hyperscan.error) as e:
+            logger.warning(f"⚠️ Could not cache Hyperscan prefilter at {cache_path}: {e}")
+    
+    def _build_re2_set(self):
+        """Union every pattern into one RE2 set for a single-pass match test.
+        
+        RE2 compiles the whole set into one automaton, so a single walk of the
+        message reports every pattern that matches anywhere in it.
+        """
+        pattern_set = re2.Set.SearchSet(self._re2_options)
+        
+        for compiled in self.compiled_patterns.values():
+            for pattern_id, regex, _, _ in compiled:
+                try:
+                    self._re2_set_ids[pattern_set.Add(regex.pattern)] = pattern_id
+                except re2.error:
+                    self._re2_always_run.add(pattern_id)
+        
+        if not self._re2_set_ids:
+            self._re2_always_run = set()
+            return
+        
+        try:
+            pattern_set.Compile()
+        except re2.error as e:
+            logger.warning(f"⚠️ RE2 pattern set unavailable, scanning every pattern with re: {e}")
+            self._re2_set_ids = {}
+            self._re2_always_run = set()
+            return
+        
+        self._re2_set = pattern_set
+        logger.info(f"✅ RE2 pattern set compiled for {len(self._re2_set_ids)} risk patterns")
+    
+    def _build_literal_automaton(self):
+        """Index each pattern's required literal in one Aho-Corasick automaton.
+        
+        A pattern can only match if its literal occurs in the message, so a
+        single literal scan rules out most patterns on clean input. Patterns
+        without a literal (pure character classes) are always run.
+        """
+        patterns_by_literal = {}
+        for compiled in self.compiled_patterns.values():
+            for pattern_id, regex, _, _ in compiled:
+                literal = _required_literal(regex.pattern)
+                if literal is None:
+                    self._literal_always_run.add(pattern_id)
+                else:
+                    patterns_by_literal.setdefault(literal, []).append(pattern_id)
+        
+        automaton = ahocorasick.Automaton()
+        for literal, pattern_ids in patterns_by_literal.items():
+            automaton.add_word(literal, tuple(pattern_ids))
+        if not patterns_by_literal:
+            self._literal_always_run = set()
+            return
+        automaton.make_automaton()
+        self._literal_automaton = automaton
+        logger.info(f"✅ Literal prefilter built for {len(patterns_by_literal)} risk pattern literals")
+    
+    def _candidate_patterns(self, content: str) -> Optional[Set[int]]:
+        """Return ids of patterns that may match content, or None to run them all"""
+        if self._hs_db is not None:
+            # Scratch space must not be shared between threads
+            scratch = getattr(self._hs_local, "scratch", None)
+            if scratch is None:
+                scratch = self._hs_local.scratch = hyperscan.Scratch(self._hs_db)
+            
+            candidates = set(self._hs_always_run)
+            self._hs_db.scan(
+                content.encode("utf-8"),
+                match_event_handler=_collect_hyperscan_match,
+                context=candidates,
+                scratch=scratch
+            )
+            return candidates
+        
+        # RE2's \b, \d and \w are ASCII-only, so the set is only exact on ASCII text
+        if self._re2_set is not None and content.isascii():
+            candidates = set(self._re2_always_run)
+            matched = self._re2_set.Match(content)
+            if matched:
+                candidates.update(self._re2_set_ids[index] for index in matched)
+            return candidates
+        
+        # Lowercasing is only a faithful stand-in for IGNORECASE on ASCII text
+        if self._literal_automaton is not None and content.isascii():
+            candidates = set(self._literal_always_run)
+            for _, pattern_ids in self._literal_automaton.iter(content.lower()):
+                candidates.update(pattern_ids)
+            return candidates
+        
+        return None
+    
+    @staticmethod
+    def _content_cache_key(content: str):
+        """Key caches by the message itself, or by its digest for long messages"""
+        if len(content) <= SCAN_CACHE_MAX_KEY_CHARS:
+            return content
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+    
+    def _scan_patterns(self, content: str) -> Dict[str, Tuple[Tuple[str, tuple, Optional[PiiKind]], ...]]:
+        """Return (pattern, matches, kind) hits per risk type, cached by content.
+        
+        This is the pure regex part of the analysis; context multipliers and
+        scoring are applied by the caller, so the result can be shared by
+        every user sending the same text. Treat it as read-only.
+        """
+        cache_key = self._content_cache_key(content)
+        with self._scan_cache_lock:
+            pattern_hits = self._scan_cache.get(cache_key)
+        if pattern_hits is not None:
+            return pattern_hits
+        
+        # Patterns are compiled case-insensitive, so no lowercased copy is needed
+        candidates = self._candidate_patterns(content)
+        # RE2 is linear-time but ASCII-only for \b/\d/\w; keep re for other text
+        use_re2 = content.isascii()
+        # One digit probe rules out every numeric PII pattern on digit-free text
+        skip_ids = self._digit_pattern_ids if _DIGIT_RE.search(content) is None else frozenset()
+        
+        pattern_hits = {}
+        for risk_type, compiled in self.compiled_patterns.items():
+            category_hits = []
+            for pattern_id, regex, regex2, kind in compiled:
+                if pattern_id in skip_ids or (candidates is not None and pattern_id not in candidates):
+                    continue
+                if use_re2 and regex2 is not None:
+                    matches = regex2.findall(content)
+                else:
+                    matches = regex.findall(content)
+                if matches:
+                    category_hits.append((regex.pattern, tuple(matches), kind))
+            if category_hits:
+                pattern_hits[risk_type] = tuple(category_hits)
+        
+        with self._scan_cache_lock:
+            self._scan_cache[cache_key] = pattern_hits
+        return pattern_hits
+    
+    def analyze_content_for_dashboard(
+        self,
+        content: str,
+        user_context: Dict[str, Any] = None,
+        include_findings: bool = False
+    ):
+        """Analyze content with deterministic risk scoring and dashboard-specific formatting
+        
+        Per-pattern findings (the matched text) are only built with
+        ``include_findings=True``; otherwise the findings lists are empty.
+        
+        Results are cached per content and score-relevant context, so the
+        same message from retries or automated clients is scored once.
+        Treat the returned dict as read-only.
+        """
+        context_multiplier = self._get_context_multiplier(user_context)
+        result_key = (self._content_cache_key(content), context_multiplier, include_findings)
+        with self._scan_cache_lock:
+            result = self._result_cache.get(result_key)
+        if result is None:
+            result = self._analyze_uncached(content, context_multiplier, include_findings)
+            with self._scan_cache_lock:
+                self._result_cache[result_key] = result
+        return result
+    
+    def _analyze_uncached(
+        self,
+        content: str,
+        context_multiplier: float,
+        include_findings: bool
+    ) -> Dict[str, Any]:
+        """Run the pattern scan and scoring behind analyze_content_for_dashboard"""
         risk_flags = []
         risk_details = {}
         total_risk_score = 0
         pattern_matches = 0
         detected_categories = []
         detailed_findings = []
+        keyword_hits = None
         
-        # Convert to lowercase for case-insensitive matching
-        content_lower = content.lower()
+        pattern_hits = self._scan_patterns(content)
+        if not pattern_hits:
+            return self._safe_result(context_multiplier)
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         
         # Analyze each risk category with deterministic scoring
         for risk_type, config in self.risk_patterns.items():
-            category_matches = []
+            category_match_count = 0
             category_score = 0
             specific_findings = []
             
-            for pattern in config["patterns"]:
-                try:
-                    matches = re.findall(pattern, content_lower)
-                    if matches:
-                        category_matches.extend(matches)
-                        pattern_matches += len(matches)
-                        specific_findings.append({
-                            "pattern": pattern,
-                            "matches": matches,
-                            "count": len(matches)
-                        })
-                        logger.info(f"🚨 Risk detected: {risk_type} - Pattern: {pattern} - Matches: {len(matches)}")
-                except re.error as e:
-                    logger.warning(f"Invalid regex pattern: {pattern} - {e}")
-                    continue
+            category_hits = pattern_hits.get(risk_type, ())
+            for pattern, matches, _ in category_hits:
+                category_match_count += len(matches)
+                if include_findings:
+                    specific_findings.append({
+                        "pattern": pattern,
+                        "matches": list(matches),
+                        "count": len(matches)
+                    })
+                if debug_enabled:
+                    logger.debug("🚨 Risk detected: %s - Pattern: %s - Matches: %d", risk_type, pattern, len(matches))
+            pattern_matches += category_match_count
             
-            if category_matches:
+            if category_hits:
                 # Calculate deterministic score based on risk type
-                category_score = self._calculate_deterministic_score(risk_type, category_matches, specific_findings)
+                if keyword_hits is None:
+                    keyword_hits = self._keyword_hits(content.lower())
+                category_score = self._calculate_deterministic_score(risk_type, category_hits, keyword_hits)
                 
                 # Map internal risk types to expected test format
-                flag_mapping = {
-                    "pii_leak": "PII Detected",
-                    "adversarial": "Adversarial Intent", 
-                    "bias": "Bias",
-                    "toxicity": "Toxicity"
-                }
-                
-                risk_flags.append(flag_mapping.get(risk_type, risk_type))
+                risk_flags.append(FLAG_DISPLAY.get(risk_type, risk_type))
                 risk_details[risk_type] = {
                     "category": risk_type,
                     "score": min(category_score, 100),
-                    "matches": len(category_matches),
+                    "matches": category_match_count,
                     "findings": specific_findings[:5],  # Limit to top 5 findings
                     "severity": self._get_severity_level(category_score),
                     "color": config["color"],
                     "icon": config["icon"],
                     "description": self._get_risk_description(risk_type),
-                    "points_breakdown": self._get_points_breakdown(risk_type, category_matches, specific_findings)
+                    "points_breakdown": self._get_points_breakdown(risk_type, category_match_count, len(category_hits))
                 }
                 detected_categories.append({
                     "type": risk_type,
@@ -343,17 +883,7 @@ class EnhancedRiskAnalyzer:
                 total_risk_score += category_score
                 detailed_findings.extend(specific_findings)
         
-        # Apply context modifiers
-        context_multiplier = 1.0
-        if user_context:
-            if user_context.get("content_length", 0) > 1000:
-                context_multiplier += 0.1
-            if user_context.get("suspicious_patterns", 0) > 0:
-                context_multiplier += 0.2
-            if user_context.get("repeat_offender", False):
-                context_multiplier += 0.3
-        
-        # Calculate final risk score with context
+        # Calculate final risk score with context modifiers
         final_score = min(int(total_risk_score * context_multiplier), 100)
         
         # Multi-risk penalty (if multiple risk types detected)
@@ -386,46 +916,71 @@ class EnhancedRiskAnalyzer:
             }
         }
     
-    def _calculate_deterministic_score(self, risk_type: str, matches: List, findings: List[Dict]) -> int:
-        """Calculate deterministic risk score based on specific patterns and multipliers"""
+    def _get_context_multiplier(self, user_context: Optional[Dict[str, Any]]) -> float:
+        """Get the score multiplier for the caller-supplied context"""
+        context_multiplier = 1.0
+        if user_context:
+            if user_context.get("content_length", 0) > 1000:
+                context_multiplier += 0.1
+            if user_context.get("suspicious_patterns", 0) > 0:
+                context_multiplier += 0.2
+            if user_context.get("repeat_offender", False):
+                context_multiplier += 0.3
+        return context_multiplier
+    
+    def mask_pii(self, content: str) -> str:
+        """Mask every PII pattern match in content so the message can be stored"""
+        for _, regex, _, _ in self.compiled_patterns.get("pii_leak", ()):
+            content = regex.sub(lambda match: pii_tokenizer.mask_pii(match.group()), content)
+        return content
+    
+    def _safe_result(self, context_multiplier: float) -> Dict[str, Any]:
+        """Build the result for content no pattern matched from the precomputed SAFE template"""
+        result = dict(self._safe_result_template)
+        result.update({
+            "risk_flags": ["None"],
+            "risk_details": {},
+            "detected_categories": [],
+            "recommendations": [],
+            "detailed_findings": [],
+            "context_multiplier": context_multiplier,
+            "scoring_breakdown": {
+                "base_score": 0,
+                "context_modifier": context_multiplier,
+                "multi_risk_penalty": False,
+                "final_score": 0
+            }
+        })
+        return result
+    
+    def _keyword_hits(self, text: str) -> Set[str]:
+        """Return the SCORING_KEYWORDS buckets whose keywords occur in text"""
+        if self._keyword_automaton is not None:
+            return {bucket for _, buckets in self._keyword_automaton.iter(text) for bucket in buckets}
+        return {bucket for keyword, buckets in self._keyword_buckets.items() if keyword in text for bucket in buckets}
+    
+    def _calculate_deterministic_score(self, risk_type: str, category_hits: Tuple, keyword_hits: Set[str]) -> int:
+        """Calculate deterministic risk score based on specific patterns and multipliers
+        
+        ``category_hits`` are the (pattern, matches, kind) hits of one category;
+        ``keyword_hits`` are the SCORING_KEYWORDS buckets found in the whole
+        message, computed once per analysis.
+        """
         base_score = 0
-        content_combined = ' '.join(str(match) for match in matches).lower()
         
         if risk_type == "pii_leak":
             base_score = self.risk_scoring["pii_detection"]["base_points"]
             
-            # Add points based on specific PII types detected
-            for finding in findings:
-                pattern = finding["pattern"]
-                count = finding["count"]
-                
-                # Determine PII type from pattern and content
-                if "@" in content_combined or "email" in pattern:
-                    base_score += self.risk_scoring["pii_detection"]["multipliers"]["email"] * count
-                elif "phone" in pattern or r"\+91" in pattern or r"\d{3}[-.]?\d{3}[-.]?\d{4}" in pattern:
-                    base_score += self.risk_scoring["pii_detection"]["multipliers"]["phone"] * count
-                elif "aadhaar" in content_combined or r"\d{4}[-\s]?\d{4}[-\s]?\d{4}" in pattern:
-                    base_score += self.risk_scoring["pii_detection"]["multipliers"]["aadhaar"] * count
-                elif "pan" in content_combined or r"[A-Z]{5}[0-9]{4}[A-Z]{1}" in pattern:
-                    base_score += self.risk_scoring["pii_detection"]["multipliers"]["pan"] * count
-                elif "credit" in content_combined or "card" in content_combined or r"\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}" in pattern:
-                    base_score += self.risk_scoring["pii_detection"]["multipliers"]["credit_card"] * count
-                elif "ssn" in pattern or r"\d{3}-?\d{2}-?\d{4}" in pattern:
-                    base_score += self.risk_scoring["pii_detection"]["multipliers"]["ssn"] * count
-                elif "address" in pattern or "street" in pattern:
-                    base_score += self.risk_scoring["pii_detection"]["multipliers"]["address"] * count
-                elif "account" in pattern or r"\d{8,18}" in pattern:
-                    base_score += self.risk_scoring["pii_detection"]["multipliers"]["bank_account"] * count
-                else:
-                    # Default PII detection gets base points
-                    base_score += 20 * count
+            # Add points based on the PII type each pattern was tagged with
+            for _, matches, kind in category_hits:
+                base_score += self._pii_points[kind] * len(matches)
         
         elif risk_type == "adversarial":
             base_score = self.risk_scoring["adversarial_intent"]["base_points"]
             
-            for finding in findings:
-                pattern = finding["pattern"].lower()
-                count = finding["count"]
+            for pattern, matches, _ in category_hits:
+                pattern = pattern.lower()
+                count = len(matches)
                 
                 # More specific pattern matching for adversarial content
                 if any(word in pattern for word in ["ignore", "disregard", "forget", "instructions"]):
@@ -440,14 +995,13 @@ class EnhancedRiskAnalyzer:
         elif risk_type == "bias":
             base_score = self.risk_scoring["bias_discrimination"]["base_points"]
             
-            for finding in findings:
-                pattern = finding["pattern"].lower()
-                count = finding["count"]
+            for _, matches, _ in category_hits:
+                count = len(matches)
                 
                 # Enhanced bias scoring based on content severity
-                if any(hate_word in content_combined for hate_word in ["terrorists", "can't be trusted", "inferior", "shouldn't get"]):
+                if "hate_speech" in keyword_hits:
                     base_score += self.risk_scoring["bias_discrimination"]["hate_speech"] * count
-                elif any(disc_word in content_combined for disc_word in ["bad at programming", "useless", "should retire", "are stupid"]):
+                elif "discrimination" in keyword_hits:
                     base_score += self.risk_scoring["bias_discrimination"]["discrimination"] * count
                 else:
                     base_score += self.risk_scoring["bias_discrimination"]["stereotyping"] * count
@@ -455,16 +1009,15 @@ class EnhancedRiskAnalyzer:
         elif risk_type == "toxicity":
             base_score = self.risk_scoring["toxicity_harm"]["base_points"]
             
-            for finding in findings:
-                pattern = finding["pattern"].lower()
-                count = finding["count"]
+            for _, matches, _ in category_hits:
+                count = len(matches)
                 
                 # Enhanced toxicity scoring
-                if any(threat_word in content_combined for threat_word in ["kill yourself", "destroy them all", "hate everyone"]):
+                if "threats" in keyword_hits:
                     base_score += self.risk_scoring["toxicity_harm"]["threats"] * count
-                elif any(harass_word in content_combined for harass_word in ["stupid idiot", "hate", "terrible"]):
+                elif "harassment" in keyword_hits:
                     base_score += self.risk_scoring["toxicity_harm"]["harassment"] * count
-                elif any(profane_word in content_combined for profane_word in ["fuck", "shit", "damn"]):
+                elif "profanity" in keyword_hits:
                     base_score += self.risk_scoring["toxicity_harm"]["profanity"] * count
                 else:
                     base_score += 30 * count  # Default toxicity score
@@ -473,23 +1026,16 @@ class EnhancedRiskAnalyzer:
     
     def _get_severity_level(self, score: int) -> str:
         """Get severity level based on score"""
-        if score >= 75:
-            return "critical"
-        elif score >= 50:
-            return "high"
-        elif score >= 25:
-            return "medium"
-        else:
-            return "low"
+        return self.SEVERITY_BY_SCORE[min(max(score, 0), 100)]
     
-    def _get_points_breakdown(self, risk_type: str, matches: List, findings: List[Dict]) -> Dict[str, Any]:
+    def _get_points_breakdown(self, risk_type: str, total_matches: int, total_patterns: int) -> Dict[str, Any]:
         """Get detailed points breakdown for transparency"""
         breakdown = {
             "risk_type": risk_type,
             "base_points": 0,
             "pattern_points": [],
-            "total_patterns": len(findings),
-            "total_matches": len(matches)
+            "total_patterns": total_patterns,
+            "total_matches": total_matches
         }
         
         if risk_type in self.risk_scoring:
@@ -506,69 +1052,23 @@ class EnhancedRiskAnalyzer:
     
     def _get_risk_level(self, score: int) -> str:
         """Get risk level from score"""
-        if score == 0:
-            return "SAFE"
-        elif score <= 25:
-            return "LOW"
-        elif score <= 50:
-            return "MEDIUM"
-        elif score <= 75:
-            return "HIGH"
-        else:
-            return "CRITICAL"
+        return self.RISK_LEVEL_BY_SCORE[min(max(score, 0), 100)]
     
     def _get_risk_description(self, risk_type: str) -> str:
         """Get human-readable risk description"""
-        descriptions = {
-            "bias": "Potential bias or discrimination detected",
-            "pii_leak": "Personal information exposure risk",
-            "adversarial": "Adversarial or prompt injection attempt",
-            "toxicity": "Toxic or harmful language detected"
-        }
-        return descriptions.get(risk_type, "Unknown risk type")
+        return self.RISK_DESCRIPTIONS.get(risk_type, "Unknown risk type")
     
     def _get_required_action(self, risk_level: str, risk_flags: List[str]) -> str:
         """Get required action based on risk level"""
-        actions = {
-            "SAFE": "continue_normally",
-            "LOW": "log_and_monitor",
-            "MEDIUM": "review_recommended",
-            "HIGH": "manual_review_required",
-            "CRITICAL": "block_and_escalate"
-        }
-        return actions.get(risk_level, "unknown_action")
+        return self.REQUIRED_ACTIONS.get(risk_level, "unknown_action")
     
     def _get_recommendations(self, risk_flags: List[str], score: int) -> List[str]:
         """Get specific recommendations based on detected risks"""
-        recommendations = []
-        
-        if "pii_leak" in risk_flags:
-            recommendations.extend([
-                "Remove personal information from message",
-                "Use anonymized examples instead",
-                "Check privacy settings"
-            ])
-        
-        if "bias" in risk_flags:
-            recommendations.extend([
-                "Rephrase using inclusive language",
-                "Avoid generalizations about groups",
-                "Consider alternative perspectives"
-            ])
-        
-        if "adversarial" in risk_flags:
-            recommendations.extend([
-                "Rephrase request without manipulation attempts",
-                "Use direct, clear questions",
-                "Follow platform guidelines"
-            ])
-        
-        if "toxicity" in risk_flags:
-            recommendations.extend([
-                "Use respectful language",
-                "Focus on constructive discussion",
-                "Consider the impact of your words"
-            ])
+        recommendations = [
+            recommendation
+            for flag in risk_flags
+            for recommendation in self.FLAG_RECOMMENDATIONS.get(flag, ())
+        ]
         
         if score >= 75:
             recommendations.append("Content blocked - please revise completely")
@@ -580,6 +1080,55 @@ class EnhancedRiskAnalyzer:
 # Initialize enhanced risk analyzer
 risk_analyzer = EnhancedRiskAnalyzer()
 
+async def analyze_risk_off_loop(
+    content: str,
+    user_context: Dict[str, Any] = None,
+    include_findings: bool = False
+) -> Dict[str, Any]:
+    """Run the risk analysis without blocking the event loop on long messages"""
+    if len(content) < ANALYZE_IN_THREAD_MIN_CHARS:
+        return risk_analyzer.analyze_content_for_dashboard(content, user_context, include_findings=include_findings)
+    return await asyncio.to_thread(
+        risk_analyzer.analyze_content_for_dashboard, content, user_context, include_findings=include_findings
+    )
+
+# Risk-bucketed response templates for generate_risk_aware_response
+CRITICAL_RESPONSE_TEMPLATE = (
+    "🚫 **Critical Security Alert** (Risk: {risk_score}%)\n\n"
+    "I've detected critical security concerns in your message related to **{risk_flag_display}**. "
+    "As AIRMS, I cannot process requests with such high risk levels for your safety and security.\n\n"
+    "**Immediate Actions Required:**\n"
+    "{recommendation_lines}"
+    "\n\n**Risk Level:** {risk_level} ({risk_score}%)\n"
+    "**Detected Issues:** {risk_flag_display}"
+)
+HIGH_RESPONSE_TEMPLATE = (
+    "⚠️ **High Risk Detected** (Risk: {risk_score}%)\n\n"
+    "I notice significant concerns in your message related to **{risk_flag_display}**. "
+    "I'm AIRMS, your AI Risk Management Assistant, and I want to help you safely.\n\n"
+    "**Safety Recommendations:**\n"
+    "{recommendation_lines}"
+    "\n\nIf you can rephrase your request following these guidelines, I'll be happy to assist you properly."
+)
+MEDIUM_RESPONSE_TEMPLATE = (
+    "🔍 **Safety Check** (Risk: {risk_score}%)\n\n"
+    "Hello! I'm AIRMS (AI Risk Management Assistant). I've noted some considerations "
+    "regarding **{risk_flag_display}** in your message, but I'm here to help.\n\n"
+    "{quick_tip}"
+    "What specific information can I help you with today?"
+)
+LOW_RESPONSE_TEMPLATE = (
+    "✅ **Safe Communication** (Risk: {risk_score}%)\n\n"
+    "Hello! I'm AIRMS (AI Risk Management Assistant). Your message appears safe and clear. "
+    "I'm here to help you with AI safety, risk management, and general assistance.\n\n"
+    "What can I help you with today?"
+)
+SAFE_RESPONSE = (
+    "Hello! I'm AIRMS (AI Risk Management Assistant), and I'm here to help you with "
+    "AI safety, risk management, and general assistance.\n\n"
+    "Your message is clear and safe. What can I help you with today?"
+)
+
 async def generate_risk_aware_response(
     user_message: str, 
     risk_analysis: Dict[str, Any], 
@@ -591,71 +1140,70 @@ async def generate_risk_aware_response(
     """
     risk_score = risk_analysis["risk_score"]
     risk_flags = risk_analysis["risk_flags"]
-    risk_level = risk_analysis["risk_level"]
     recommendations = risk_analysis.get("recommendations", [])
     
-    # Format risk flags for display (exclude 'none')
-    active_flags = [flag for flag in risk_flags if flag != "none"]
-    risk_flag_display = ", ".join([flag.replace("_", " ").title() for flag in active_flags]) if active_flags else "None"
-    
     if risk_score >= 75:
         # Critical Risk - Block and provide safety guidance
-        return (
-            f"🚫 **Critical Security Alert** (Risk: {risk_score}%)\n\n"
-            f"I've detected critical security concerns in your message related to **{risk_flag_display}**. "
-            f"As AIRMS, I cannot process requests with such high risk levels for your safety and security.\n\n"
-            f"**Immediate Actions Required:**\n" +
-            "\n".join([f"• {rec}" for rec in recommendations[:3]]) +
-            f"\n\n**Risk Level:** {risk_level} ({risk_score}%)\n"
-            f"**Detected Issues:** {risk_flag_display}\n"
-            f"**Conversation ID:** {conversation_id[:8]}..."
-        )
-    elif risk_score >= 50:
+        return _critical_response(risk_analysis)
+    
+    risk_flag_display = _risk_flag_display(risk_flags)
+    
+    if risk_score >= 50:
         # High Risk - Provide cautious assistance with warnings
-        return (
-            f"⚠️ **High Risk Detected** (Risk: {risk_score}%)\n\n"
-            f"I notice significant concerns in your message related to **{risk_flag_display}**. "
-            f"I'm AIRMS, your AI Risk Management Assistant, and I want to help you safely.\n\n"
-            f"**Safety Recommendations:**\n" +
-            "\n".join([f"• {rec}" for rec in recommendations[:3]]) +
-            f"\n\nIf you can rephrase your request following these guidelines, I'll be happy to assist you properly."
+        return HIGH_RESPONSE_TEMPLATE.format(
+            risk_score=risk_score,
+            risk_flag_display=risk_flag_display,
+            recommendation_lines=_recommendation_lines(recommendations)
         )
     elif risk_score >= 25:
         # Medium Risk - Acknowledge concerns but provide helpful response
-        return (
-            f"🔍 **Safety Check** (Risk: {risk_score}%)\n\n"
-            f"Hello! I'm AIRMS (AI Risk Management Assistant). I've noted some considerations "
-            f"regarding **{risk_flag_display}** in your message, but I'm here to help.\n\n" +
-            (f"**Quick Tip:** {recommendations[0]}\n\n" if recommendations else "") +
-            f"What specific information can I help you with today?"
+        return MEDIUM_RESPONSE_TEMPLATE.format(
+            risk_score=risk_score,
+            risk_flag_display=risk_flag_display,
+            quick_tip=f"**Quick Tip:** {recommendations[0]}\n\n" if recommendations else ""
         )
     elif risk_score >= 5:
         # Low Risk - Normal helpful response with minimal safety note
-        return (
-            f"✅ **Safe Communication** (Risk: {risk_score}%)\n\n"
-            f"Hello! I'm AIRMS (AI Risk Management Assistant). Your message appears safe and clear. "
-            f"I'm here to help you with AI safety, risk management, and general assistance.\n\n"
-            f"What can I help you with today?"
-        )
+        return LOW_RESPONSE_TEMPLATE.format(risk_score=risk_score)
     else:
         # No Risk - Completely normal response
-        return (
-            f"Hello! I'm AIRMS (AI Risk Management Assistant), and I'm here to help you with "
-            f"AI safety, risk management, and general assistance.\n\n"
-            f"Your message is clear and safe. What can I help you with today?"
-        )
+        return SAFE_RESPONSE
+
+def _critical_response(risk_analysis: Dict[str, Any]) -> str:
+    """
+    Build the blocking response for critical-risk input
+
+    Only server-generated text goes into it (no client-supplied ids), which is
+    what lets /realtime skip analyzing it as output.
+    """
+    risk_score = risk_analysis["risk_score"]
+    risk_flag_display = _risk_flag_display(risk_analysis["risk_flags"])
+    return CRITICAL_RESPONSE_TEMPLATE.format(
+        risk_score=risk_score,
+        risk_level=risk_analysis["risk_level"],
+        risk_flag_display=risk_flag_display,
+        recommendation_lines=_recommendation_lines(risk_analysis.get("recommendations", []))
+    )
+
+def _risk_flag_display(risk_flags: List[str]) -> str:
+    """Format risk flags for display (exclude 'none')"""
+    active_flags = [FLAG_DISPLAY.get(flag, flag.replace("_", " ").title()) for flag in risk_flags if flag not in NONE_FLAGS]
+    return ", ".join(active_flags) if active_flags else "None"
+
+def _recommendation_lines(recommendations: List[str]) -> str:
+    """Format the top three recommendations as a bullet list"""
+    top_recommendations = recommendations[:3]
+    if not top_recommendations:
+        return ""
+    return "• " + "\n• ".join(top_recommendations)
 
 async def log_chat_interaction(interaction_data: Dict[str, Any]) -> None:
     """
     Log chat interaction with risk metrics using PII-safe tokenization for MongoDB storage
-    Saves to both chat_logs (detailed) and risk_logs (dashboard analytics)
+    Queues the entry for the background writer, which saves batches to chat_logs (detailed);
+    risk_logs (dashboard analytics) is projected from chat_logs in the background
     """
     try:
-        # Import the MongoDB models and database connection
-        from app.models.chat_log import ChatLogRepository
-        from app.models.risk_log import RiskLogRepository
-        from app.core.database import mongodb
-        
         # Create safe log entry with tokenized PII
         safe_log_entry = create_safe_log(
             message=interaction_data["user_message"],
@@ -667,9 +1215,10 @@ async def log_chat_interaction(interaction_data: Dict[str, Any]) -> None:
         
         # Add additional metadata
         safe_log_entry.update({
+            "masked_input": risk_analyzer.mask_pii(interaction_data["user_message"]),  # Stored instead of the raw message
             "user_message_id": interaction_data["user_message_id"],
             "assistant_message_id": interaction_data["assistant_message_id"],
-            "ai_response": interaction_data["ai_response"],  # Add AI response for risk_logs
+            "ai_response": interaction_data["ai_response"],  # Projected into risk_logs
             "ai_response_length": len(interaction_data["ai_response"]),
             "risk_level": interaction_data["risk_level"],
             "confidence": interaction_data.get("detailed_risk_analysis", {}).get("confidence", 0.0),
@@ -684,21 +1233,86 @@ async def log_chat_interaction(interaction_data: Dict[str, Any]) -> None:
             }
         })
         
-        # Create repository instances
-        chat_repo = ChatLogRepository(mongodb.database)
-        risk_repo = RiskLogRepository(mongodb.database)
+        # Hand off to the background writer; drop the oldest entry rather than
+        # growing without bound when the database falls behind
+        queue = start_chat_log_writer()
+        if queue.full():
+            dropped = queue.get_nowait()
+            if dropped is None:
+                # The writer is stopping; keep its shutdown sentinel and drop the new entry instead
+                queue.put_nowait(None)
+                logger.warning(f"⚠️ Chat log writer is stopping, dropped entry for conversation {safe_log_entry['conversation_id']}")
+                return
+            logger.warning(f"⚠️ Chat log queue full, dropped entry for conversation {dropped['conversation_id']}")
+        queue.put_nowait(safe_log_entry)
         
-        # Save detailed log to chat_logs collection (NO RAW PII)
-        document_id = await chat_repo.save_chat_interaction(safe_log_entry)
+    except Exception as e:
+        logger.error(f"❌ Failed to queue chat interaction for logging: {e}")
+        _log_chat_fallback({
+            "conversation_id": interaction_data.get("conversation_id"),
+            "message_hash": pii_tokenizer.hash_pii(interaction_data.get("user_message", ""), include_salt=False),
+            "risk_score": interaction_data.get("risk_score"),
+            "risk_level": interaction_data.get("risk_level"),
+            "risk_flags": interaction_data.get("risk_flags"),
+            "timestamp": interaction_data.get("timestamp")
+        }, e)
+
+class _LazyJson:
+    """Serialize a dict to JSON only when a log record is actually formatted"""
+    
+    __slots__ = ("data",)
+    
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+    
+    def __str__(self) -> str:
+        return orjson.dumps(self.data, default=str, option=orjson.OPT_NAIVE_UTC).decode()
+
+def _log_chat_fallback(log_entry: Dict[str, Any], error: Exception) -> None:
+    """Fallback to file-based logging if database fails (also PII-safe)"""
+    if not logger.isEnabledFor(logging.WARNING):
+        return
+    try:
+        fallback_entry = {
+            "event_type": "chat_interaction_fallback",
+            "conversation_id": log_entry["conversation_id"],
+            "message_hash": log_entry["message_hash"],
+            "risk_score": log_entry["risk_score"],
+            "risk_level": log_entry["risk_level"],
+            "risk_flags": log_entry["risk_flags"],
+            "timestamp": log_entry["timestamp"],
+            "error": str(error)
+        }
+        logger.warning("📝 FALLBACK_LOGGING: %s", _LazyJson(fallback_entry))
+    except Exception as fallback_error:
+        logger.error(f"❌ Even fallback logging failed: {fallback_error}")
+
+async def _write_chat_log_batch(batch: List[Dict[str, Any]]) -> None:
+    """Save a batch of safe log entries to chat_logs with a single insert"""
+    try:
+        # Import the MongoDB models and database connection
+        from app.models.chat_log import ChatLogRepository
+        from app.core.database import mongodb
         
-        # Save simplified log to risk_logs collection for dashboard analytics
-        risk_log_id = await risk_repo.save_risk_log(safe_log_entry)
+        # Save detailed logs to chat_logs collection (NO RAW PII)
+        chat_repo = ChatLogRepository(mongodb.database)
+        document_ids = await chat_repo.save_chat_interactions(batch)
         
+    except Exception as e:
+        logger.error(f"❌ Failed to log {len(batch)} chat interactions to database: {e}")
+        for safe_log_entry in batch:
+            _log_chat_fallback(safe_log_entry, e)
+        return
+    
+    # Structured analytics entries are only built when INFO is emitted
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
+    for safe_log_entry, document_id in zip(batch, document_ids):
         # Log structured data for immediate analytics (also PII-safe)
         analytics_entry = {
             "event_type": "chat_interaction",
             "document_id": document_id,
-            "risk_log_id": risk_log_id,
             "conversation_id": safe_log_entry["conversation_id"],
             "timestamp": safe_log_entry["timestamp"],
             "risk_metrics": {
@@ -717,30 +1331,209 @@ async def log_chat_interaction(interaction_data: Dict[str, Any]) -> None:
         }
         
         # Log for immediate monitoring (NO RAW PII)
-        logger.info(f"📊 CHAT_ANALYTICS: {analytics_entry}")
-        logger.info(f"💾 Chat interaction saved: chat_logs ID: {document_id}, risk_logs ID: {risk_log_id} (PII tokenized)")
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to log chat interaction to database: {e}")
-        # Fallback to file-based logging if database fails (also PII-safe)
+        logger.info("📊 CHAT_ANALYTICS: %s", analytics_entry)
+    
+    logger.info("💾 %d chat interactions saved to chat_logs (PII tokenized)", len(batch))
+
+async def _run_chat_log_writer(queue: asyncio.Queue) -> None:
+    """Drain the chat log queue in batches until the None sentinel arrives"""
+    batch_size = settings.CHAT_LOG_BATCH_SIZE
+    flush_interval = settings.CHAT_LOG_FLUSH_INTERVAL_MS / 1000
+    
+    while True:
+        safe_log_entry = await queue.get()
+        if safe_log_entry is None:
+            return
+        batch = [safe_log_entry]
+        
+        # Give a partial batch a moment to fill before writing it
+        if queue.qsize() < batch_size - 1:
+            await asyncio.sleep(flush_interval)
+        
+        closing = False
+        while len(batch) < batch_size and not queue.empty():
+            safe_log_entry = queue.get_nowait()
+            if safe_log_entry is None:
+                closing = True
+                break
+            batch.append(safe_log_entry)
+        
+        await _write_chat_log_batch(batch)
+        if closing:
+            return
+
+async def _project_risk_logs(since: Optional[datetime]) -> Optional[datetime]:
+    """Project chat logs inserted since the given time into risk_logs; returns the next start time"""
+    from app.models.risk_log import RiskLogRepository
+    from app.core.database import mongodb
+    
+    started_at = datetime.utcnow()
+    await RiskLogRepository(mongodb.database).project_chat_logs(since)
+    # Overlap the next window so late inserts from other workers are not missed
+    return started_at - timedelta(seconds=RISK_LOG_PROJECTION_OVERLAP_SECONDS)
+
+async def _run_risk_log_projector() -> None:
+    """Periodically derive risk_logs from newly inserted chat_logs, backing off while it fails"""
+    since = None
+    resumed = False
+    failures = 0
+    while True:
+        delay = settings.RISK_LOG_PROJECTION_INTERVAL_SECONDS * 2 ** min(failures, 10)
+        await asyncio.sleep(min(delay, RISK_LOG_PROJECTION_MAX_BACKOFF_SECONDS))
         try:
-            fallback_entry = {
-                "event_type": "chat_interaction_fallback",
-                "conversation_id": interaction_data["conversation_id"],
-                "message_hash": pii_tokenizer.hash_pii(interaction_data["user_message"], include_salt=False),
-                "risk_score": interaction_data["risk_score"],
-                "risk_level": interaction_data["risk_level"],
-                "risk_flags": interaction_data["risk_flags"],
-                "timestamp": interaction_data["timestamp"],
-                "error": str(e)
-            }
-            import json
-            logger.warning(f"📝 FALLBACK_LOGGING: {json.dumps(fallback_entry)}")
-        except Exception as fallback_error:
-            logger.error(f"❌ Even fallback logging failed: {fallback_error}")
+            from app.models.risk_log import RiskLogRepository
+            from app.core.database import mongodb
+            
+            if not resumed:
+                since = await RiskLogRepository(mongodb.database).get_latest_log_time()
+                resumed = True
+            since = await _project_risk_logs(since)
+            failures = 0
+        except Exception as e:
+            failures += 1
+            logger.error(f"❌ Risk log projection failed ({failures} in a row): {e}")
+
+def start_chat_log_writer() -> asyncio.Queue:
+    """Start the background chat log writer and risk log projector if they are not running"""
+    global _chat_log_queue, _chat_log_writer, _risk_log_projector
+    if _chat_log_writer is None or _chat_log_writer.done():
+        _chat_log_queue = asyncio.Queue(maxsize=settings.TASK_QUEUE_SIZE)
+        _chat_log_writer = asyncio.create_task(_run_chat_log_writer(_chat_log_queue))
+    if _risk_log_projector is None or _risk_log_projector.done():
+        _risk_log_projector = asyncio.create_task(_run_risk_log_projector())
+    return _chat_log_queue
+
+async def stop_chat_log_writer() -> None:
+    """Flush queued chat logs, project them into risk_logs and stop the background tasks"""
+    global _chat_log_queue, _chat_log_writer, _risk_log_projector
+    if _chat_log_writer is None:
+        return
+    if not _chat_log_writer.done():
+        await _chat_log_queue.put(None)
+        await _chat_log_writer
+    _chat_log_queue = None
+    _chat_log_writer = None
+    
+    if _risk_log_projector is not None:
+        _risk_log_projector.cancel()
+        # Wait for a projection in progress to unwind before running the final one
+        with suppress(asyncio.CancelledError):
+            await _risk_log_projector
+        _risk_log_projector = None
+        try:
+            await _project_risk_logs(datetime.utcnow() - timedelta(seconds=RISK_LOG_PROJECTION_OVERLAP_SECONDS))
+        except Exception as e:
+            logger.error(f"❌ Final risk log projection failed: {e}")
+
+def _merge_risk_flags(*flag_lists: List[str]) -> List[str]:
+    """Merge risk flag lists into deduplicated display flags in one pass; ["None"] if no risks remain"""
+    return list(dict.fromkeys(
+        FLAG_DISPLAY.get(flag, flag.replace("_", " ").title())
+        for flag in chain.from_iterable(flag_lists) if flag not in NONE_FLAGS
+    )) or list(NO_RISK_FLAGS)
+
+def _combined_risk_score(input_score: int, output_score: int) -> int:
+    """Weight input 70% and output 30%, rounding half up in integer arithmetic"""
+    return (input_score * 7 + output_score * 3 + 5) // 10
+
+@lru_cache(maxsize=IP_HASH_CACHE_SIZE)
+def _hash_client_ip(host: str) -> str:
+    """Hash a client IP for storage (never store the raw IP)"""
+    return pii_tokenizer.hash_pii(host, include_salt=False)
+
+async def get_ip_hash(http_request: Request) -> Optional[str]:
+    """Get the client IP hash, computed at most once per request and cached per client"""
+    ip_hash = getattr(http_request.state, "ip_hash", None)
+    if ip_hash is None and http_request.client is not None:
+        ip_hash = http_request.state.ip_hash = _hash_client_ip(http_request.client.host)
+    return ip_hash
+
+def _sse_event(event: str, data: Any) -> bytes:
+    """Encode a single Server-Sent Events frame"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+async def _finalize_realtime(
+    request: ChatRequest,
+    conversation_id: str,
+    current_time: str,
+    ip_hash: Optional[str],
+    risk_result: Dict[str, Any],
+    ai_response: str,
+    output_risk_result: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Combine input and output risk, log the interaction and build the realtime payload"""
+    # Calculate combined risk score (70% input, 30% output)
+    combined_risk_score = _combined_risk_score(risk_result['risk_score'], output_risk_result['risk_score'])
+    
+    # Combine risk flags from input and output analysis
+    final_risk_flags = _merge_risk_flags(risk_result["risk_flags"], output_risk_result["risk_flags"])
+    
+    # Log the interaction for analytics
+    await log_chat_interaction({
+        "conversation_id": conversation_id,
+        "user_message": request.message,
+        "ai_response": ai_response,
+        "risk_score": combined_risk_score,
+        "risk_level": risk_analyzer._get_risk_level(combined_risk_score),
+        "risk_flags": final_risk_flags,
+        "timestamp": current_time,
+        "user_message_id": next_id(),
+        "assistant_message_id": next_id(),
+        "ip_hash": ip_hash,
+        "detailed_risk_analysis": {
+            "input_risks": risk_result["risk_details"],
+            "output_risks": output_risk_result["risk_details"],
+            "scoring_breakdown": risk_result.get("scoring_breakdown", {}),
+            "confidence": risk_result["confidence"]
+        }
+    })
+    
+    logger.info("🚀 Real-time chat - ID: %s..., Risk: %d%%, Flags: %s", conversation_id[:8], combined_risk_score, final_risk_flags)
+    
+    # Return the exact format requested
+    return {
+        "message": ai_response,
+        "risk_score": combined_risk_score,
+        "risk_flags": final_risk_flags,
+        "conversation_id": conversation_id,
+        "timestamp": current_time
+    }
+
+async def _stream_realtime(
+    request: ChatRequest,
+    conversation_id: str,
+    current_time: str,
+    ip_hash: Optional[str],
+    risk_result: Dict[str, Any],
+    ai_response: str,
+    output_task: Optional[asyncio.Task]
+) -> AsyncIterator[bytes]:
+    """Stream the response paragraph by paragraph while output analysis runs, then send the final scores"""
+    try:
+        # Concatenating the token payloads reproduces the message exactly
+        paragraphs = ai_response.split("\n\n")
+        for chunk in paragraphs[:-1]:
+            yield _sse_event("token", chunk + "\n\n")
+        yield _sse_event("token", paragraphs[-1])
+        output_risk_result = await output_task if output_task is not None else ZERO_RISK_RESULT
+        result = await _finalize_realtime(
+            request, conversation_id, current_time, ip_hash, risk_result, ai_response, output_risk_result
+        )
+        del result["message"]
+        yield _sse_event("final", result)
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error(f"❌ Real-time chat stream failed: {e}")
+        if output_task is not None:
+            output_task.cancel()
+        yield _sse_event("error", {"detail": f"Real-time chat processing failed: {str(e)}"})
 
-@router.post("/realtime")
-async def realtime_chat_with_risk_scoring(request: ChatRequest) -> Dict[str, Any]:
+@router.post("/realtime", response_model=None)
+async def realtime_chat_with_risk_scoring(
+    request: ChatRequest,
+    stream: bool = False,
+    ip_hash: Optional[str] = Depends(get_ip_hash)
+) -> Union[Dict[str, Any], StreamingResponse]:
     """
     🚀 **Real-Time Chat with Dynamic Risk Scoring**
     
@@ -750,103 +1543,60 @@ async def realtime_chat_with_risk_scoring(request: ChatRequest) -> Dict[str, Any
     - risk_flags: List of detected risk categories
     - conversation_id: Unique conversation identifier
     - timestamp: ISO format timestamp
+    
+    With `?stream=true` the response is sent as Server-Sent Events instead: `token`
+    events carry the message in paragraphs and a closing `final` event carries the
+    remaining fields once output analysis has finished.
     """
     try:
         # Generate IDs and timestamp
-        conversation_id = request.conversation_id or str(uuid.uuid4())
+        conversation_id = request.conversation_id or next_id()
         current_time = datetime.utcnow().isoformat() + "Z"
         
         # Enhanced context for better risk detection
-        user_context = request.context or {}
-        user_context.update({
+        user_context = {
+            **(request.context or {}),
             "content_length": len(request.message),
             "timestamp": current_time,
             "conversation_id": conversation_id,
             "endpoint": "realtime_chat"
-        })
+        }
         
         # Perform comprehensive risk analysis
-        risk_result = risk_analyzer.analyze_content_for_dashboard(request.message, user_context)
-        
-        # Format risk flags for frontend (convert underscores to spaces, capitalize)
-        formatted_risk_flags = []
-        for flag in risk_result["risk_flags"]:
-            if flag != "none":
-                # Convert flag names to user-friendly format
-                if flag == "pii_leak":
-                    formatted_risk_flags.append("PII Detected")
-                elif flag == "adversarial":
-                    formatted_risk_flags.append("Adversarial Intent")
-                elif flag == "bias":
-                    formatted_risk_flags.append("Bias")
-                elif flag == "toxicity":
-                    formatted_risk_flags.append("Toxicity")
-                else:
-                    formatted_risk_flags.append(flag.replace("_", " ").title())
+        risk_result = await analyze_risk_off_loop(request.message, user_context)
         
-        # If no risks detected, use ["None"]
-        if not formatted_risk_flags:
-            formatted_risk_flags = ["None"]
-        
-        # Generate risk-aware AI response
-        ai_response = await generate_risk_aware_response(
-            user_message=request.message,
-            risk_analysis=risk_result,
-            conversation_id=conversation_id,
-            system_prompt=AIRMS_SYSTEM_PROMPT
-        )
+        skip_output_analysis = settings.SKIP_LLM_ON_CRITICAL and risk_result["risk_score"] >= 75
+        if skip_output_analysis:
+            # Critical input always gets the fixed blocking response, which carries no risk itself
+            ai_response = _critical_response(risk_result)
+        else:
+            # Generate risk-aware AI response
+            ai_response = await generate_risk_aware_response(
+                user_message=request.message,
+                risk_analysis=risk_result,
+                conversation_id=conversation_id,
+                system_prompt=AIRMS_SYSTEM_PROMPT
+            )
         
-        # Analyze AI response for output safety
         output_context = {"content_length": len(ai_response), "message_type": "ai_output"}
-        output_risk_result = risk_analyzer.analyze_content_for_dashboard(ai_response, output_context)
-        
-        # Calculate combined risk score (70% input, 30% output)
-        combined_risk_score = int((risk_result['risk_score'] * 0.7) + (output_risk_result['risk_score'] * 0.3))
-        
-        # Combine risk flags from input and output analysis
-        all_risk_flags = set(formatted_risk_flags)
-        for flag in output_risk_result["risk_flags"]:
-            if flag != "none":
-                if flag == "pii_leak":
-                    all_risk_flags.add("PII Detected")
-                elif flag == "adversarial":
-                    all_risk_flags.add("Adversarial Intent")
-                elif flag == "bias":
-                    all_risk_flags.add("Bias")
-                elif flag == "toxicity":
-                    all_risk_flags.add("Toxicity")
-        
-        final_risk_flags = list(all_risk_flags) if all_risk_flags else ["None"]
-        
-        # Log the interaction for analytics
-        await log_chat_interaction({
-            "conversation_id": conversation_id,
-            "user_message": request.message,
-            "ai_response": ai_response,
-            "risk_score": combined_risk_score,
-            "risk_level": risk_analyzer._get_risk_level(combined_risk_score),
-            "risk_flags": final_risk_flags,
-            "timestamp": current_time,
-            "user_message_id": str(uuid.uuid4()),
-            "assistant_message_id": str(uuid.uuid4()),
-            "detailed_risk_analysis": {
-                "input_risks": risk_result["risk_details"],
-                "output_risks": output_risk_result["risk_details"],
-                "scoring_breakdown": risk_result.get("scoring_breakdown", {}),
-                "confidence": risk_result["confidence"]
-            }
-        })
         
-        logger.info(f"🚀 Real-time chat - ID: {conversation_id[:8]}..., Risk: {combined_risk_score}%, Flags: {final_risk_flags}")
+        if stream:
+            # Output analysis overlaps with sending the message to the client
+            output_task = None if skip_output_analysis else asyncio.create_task(
+                analyze_risk_off_loop(ai_response, output_context)
+            )
+            return StreamingResponse(
+                _stream_realtime(request, conversation_id, current_time, ip_hash, risk_result, ai_response, output_task),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
         
-        # Return the exact format requested
-        return {
-            "message": ai_response,
-            "risk_score": combined_risk_score,
-            "risk_flags": final_risk_flags,
-            "conversation_id": conversation_id,
-            "timestamp": current_time
-        }
+        # Analyze AI response for output safety
+        output_risk_result = ZERO_RISK_RESULT if skip_output_analysis else await analyze_risk_off_loop(ai_response, output_context)
+        
+        return await _finalize_realtime(
+            request, conversation_id, current_time, ip_hash, risk_result, ai_response, output_risk_result
+        )
         
     except Exception as e:
         logger.error(f"❌ Real-time chat failed: {e}")
@@ -856,7 +1606,10 @@ async def realtime_chat_with_risk_scoring(request: ChatRequest) -> Dict[str, Any
         )
 
 @router.post("/completion", response_model=ChatResponse)
-async def chat_completion_with_dashboard_data(request: ChatRequest) -> ChatResponse:
+async def chat_completion_with_dashboard_data(
+    request: ChatRequest,
+    ip_hash: Optional[str] = Depends(get_ip_hash)
+) -> ChatResponse:
     """
     💬 **Enhanced Chat with Real-Time Risk Detection and System Prompt Integration**
     
@@ -864,21 +1617,33 @@ async def chat_completion_with_dashboard_data(request: ChatRequest) -> ChatRespo
     """
     try:
         # Generate conversation ID and message IDs
-        conversation_id = request.conversation_id or str(uuid.uuid4())
-        user_message_id = str(uuid.uuid4())
-        assistant_message_id = str(uuid.uuid4())
+        conversation_id = request.conversation_id or next_id()
+        user_message_id = next_id()
+        assistant_message_id = next_id()
         current_time = datetime.utcnow().isoformat()
         
         # Analyze user message for risks with enhanced context
-        user_context = request.context or {}
-        user_context["content_length"] = len(request.message)
-        user_context["timestamp"] = current_time
-        user_context["message_type"] = "user_input"
+        user_context = {
+            **(request.context or {}),
+            "content_length": len(request.message),
+            "timestamp": current_time,
+            "message_type": "user_input"
+        }
         
-        # Perform comprehensive risk analysis
-        risk_result = risk_analyzer.analyze_content_for_dashboard(request.message, user_context)
+        # Perform comprehensive risk analysis; findings are only needed for the
+        # dashboard detail view of risky messages, and the rerun hits the scan cache.
+        # The response only needs the score and flags, so the rerun overlaps it
+        risk_result = await analyze_risk_off_loop(request.message, user_context)
+        findings_task = None
+        if risk_result["risk_score"] >= 50:
+            findings_task = asyncio.create_task(
+                analyze_risk_off_loop(request.message, user_context, include_findings=True)
+            )
         
-        logger.info(f"🔍 Real-time risk analysis - Score: {risk_result['risk_score']}%, Level: {risk_result['risk_level']}, Flags: {risk_result['risk_flags']}")
+        logger.info(
+            "🔍 Real-time risk analysis - Score: %d%%, Level: %s, Flags: %s",
+            risk_result["risk_score"], risk_result["risk_level"], risk_result["risk_flags"]
+        )
         
         # Generate AI response with system prompt guidance and risk-aware content
         ai_response = await generate_risk_aware_response(
@@ -890,26 +1655,29 @@ async def chat_completion_with_dashboard_data(request: ChatRequest) -> ChatRespo
         
         # Analyze AI response for additional risks (output safety check)
         output_context = {"content_length": len(ai_response), "message_type": "ai_output"}
-        output_risk_result = risk_analyzer.analyze_content_for_dashboard(ai_response, output_context)
+        if findings_task is None:
+            output_risk_result = await analyze_risk_off_loop(ai_response, output_context)
+        else:
+            risk_result, output_risk_result = await asyncio.gather(
+                findings_task, analyze_risk_off_loop(ai_response, output_context)
+            )
         
         # Combine input and output risk scores (weighted: 70% input, 30% output)
-        combined_risk_score = int((risk_result['risk_score'] * 0.7) + (output_risk_result['risk_score'] * 0.3))
-        combined_risk_flags = list(set(risk_result['risk_flags'] + output_risk_result['risk_flags']))
-        if "none" in combined_risk_flags and len(combined_risk_flags) > 1:
-            combined_risk_flags.remove("none")
+        combined_risk_score = _combined_risk_score(risk_result['risk_score'], output_risk_result['risk_score'])
+        combined_risk_flags = _merge_risk_flags(risk_result["risk_flags"], output_risk_result["risk_flags"])
         
         # Determine final risk level
         final_risk_level = risk_analyzer._get_risk_level(combined_risk_score)
         
-        # Create message objects
+        # Create message objects; every field is built here, so skip re-validation
         messages = [
-            ChatMessage(
+            ChatMessage.model_construct(
                 role="user",
                 content=request.message,
                 timestamp=current_time,
                 message_id=user_message_id
             ),
-            ChatMessage(
+            ChatMessage.model_construct(
                 role="assistant",
                 content=ai_response,
                 timestamp=current_time,
@@ -918,10 +1686,10 @@ async def chat_completion_with_dashboard_data(request: ChatRequest) -> ChatRespo
         ]
         
         # Create comprehensive risk analysis for dashboard
-        risk_analysis = RiskAnalysis(
+        risk_analysis = RiskAnalysis.model_construct(
             risk_score=combined_risk_score,
             risk_level=final_risk_level,
-            risk_flags=combined_risk_flags if combined_risk_flags and combined_risk_flags != ["none"] else ["None"],
+            risk_flags=combined_risk_flags,
             risk_details={
                 "input_analysis": risk_result["risk_details"],
                 "output_analysis": output_risk_result["risk_details"],
@@ -965,6 +1733,7 @@ async def chat_completion_with_dashboard_data(request: ChatRequest) -> ChatRespo
             "timestamp": current_time,
             "user_message_id": user_message_id,
             "assistant_message_id": assistant_message_id,
+            "ip_hash": ip_hash,
             "detailed_risk_analysis": {
                 "input_risks": risk_result["risk_details"],
                 "output_risks": output_risk_result["risk_details"],
@@ -973,9 +1742,12 @@ async def chat_completion_with_dashboard_data(request: ChatRequest) -> ChatRespo
             }
         })
         
-        logger.info(f"💾 Enhanced chat completed - ID: {conversation_id}, Final Risk: {combined_risk_score}% ({final_risk_level}), Flags: {combined_risk_flags}")
+        logger.info(
+            "💾 Enhanced chat completed - ID: %s, Final Risk: %d%% (%s), Flags: %s",
+            conversation_id, combined_risk_score, final_risk_level, combined_risk_flags
+        )
         
-        return ChatResponse(
+        return ChatResponse.model_construct(
             success=True,
             conversation_id=conversation_id,
             messages=messages,
@@ -990,61 +1762,56 @@ async def chat_completion_with_dashboard_data(request: ChatRequest) -> ChatRespo
             detail=f"Chat processing failed: {str(e)}"
         )
 
+async def _load_risk_statistics() -> Dict[str, Any]:
+    """Load dashboard risk statistics from MongoDB"""
+    from app.models.chat_log import ChatLogRepository
+    from app.core.database import mongodb
+    
+    # Create repository instance
+    chat_repo = ChatLogRepository(mongodb.database)
+    
+    # Get overview, distribution and category counts in one aggregation, recent activity alongside it
+    stats = await chat_repo.get_dashboard_statistics(recent_limit=10)
+    overview = stats["overview"]
+    distribution = stats["risk_distribution"]
+    flag_counts = stats["flag_counts"]
+    
+    response_data = {
+        "overview": {
+            "total_chats": overview.get("total_chats", 0),
+            "total_risk_detections": overview.get("total_risk_detections", 0),
+            "average_risk_score": round(overview.get("average_risk_score") or 0.0, 1),
+            "blocked_messages": overview.get("blocked_messages", 0)
+        },
+        "risk_distribution": {
+            level: distribution.get(level, {"count": 0, "percentage": 0.0})
+            for level in ("safe", "low_risk", "medium_risk", "high_risk", "critical_risk")
+        },
+        "top_risk_categories": [
+            {"category": "pii_leak", "count": flag_counts.get(FLAG_DISPLAY["pii_leak"], 0), "icon": "🔒", "color": "#FF1744"},
+            {"category": "bias", "count": flag_counts.get(FLAG_DISPLAY["bias"], 0), "icon": "⚖️", "color": "#FF6B35"},
+            {"category": "adversarial", "count": flag_counts.get(FLAG_DISPLAY["adversarial"], 0), "icon": "🛡️", "color": "#9C27B0"},
+            {"category": "toxicity", "count": flag_counts.get(FLAG_DISPLAY["toxicity"], 0), "icon": "☠️", "color": "#FF5722"}
+        ],
+        "recent_activity": stats["recent_activity"],
+        "data_source": "mongodb_realtime",
+        "last_updated": datetime.utcnow().isoformat() + "Z"
+    }
+    
+    return response_data
+
 @router.get("/risk-stats")
 async def get_chat_risk_statistics() -> BaseResponse:
     """Get real-time chat risk statistics from MongoDB for dashboard"""
     try:
-        from app.models.chat_log import ChatLogRepository
-        from app.core.database import mongodb
-        
-        # Create repository instance
-        chat_repo = ChatLogRepository(mongodb.database)
-        
-        # Get real-time statistics from database
-        stats = await chat_repo.get_risk_statistics()
-        
-        # Calculate percentages
-        total_chats = max(stats.get("total_chats", 0), 1)  # Prevent division by zero
-        
-        response_data = {
-            "overview": {
-                "total_chats": stats.get("total_chats", 0),
-                "total_risk_detections": stats.get("total_risk_detections", 0),
-                "average_risk_score": round(stats.get("average_risk_score", 0.0), 1),
-                "blocked_messages": stats.get("blocked_messages", 0)
-            },
-            "risk_distribution": {
-                "safe": {
-                    "count": stats.get("safe_count", 0), 
-                    "percentage": round((stats.get("safe_count", 0) / total_chats) * 100, 1)
-                },
-                "low_risk": {
-                    "count": stats.get("low_risk_count", 0), 
-                    "percentage": round((stats.get("low_risk_count", 0) / total_chats) * 100, 1)
-                },
-                "medium_risk": {
-                    "count": stats.get("medium_risk_count", 0), 
-                    "percentage": round((stats.get("medium_risk_count", 0) / total_chats) * 100, 1)
-                },
-                "high_risk": {
-                    "count": stats.get("high_risk_count", 0), 
-                    "percentage": round((stats.get("high_risk_count", 0) / total_chats) * 100, 1)
-                },
-                "critical_risk": {
-                    "count": stats.get("critical_risk_count", 0), 
-                    "percentage": round((stats.get("critical_risk_count", 0) / total_chats) * 100, 1)
-                }
-            },
-            "top_risk_categories": [
-                {"category": "pii_leak", "count": stats.get("pii_detections", 0), "icon": "🔒", "color": "#FF1744"},
-                {"category": "bias", "count": stats.get("bias_detections", 0), "icon": "⚖️", "color": "#FF6B35"},
-                {"category": "adversarial", "count": stats.get("adversarial_detections", 0), "icon": "🛡️", "color": "#9C27B0"},
-                {"category": "toxicity", "count": stats.get("toxicity_detections", 0), "icon": "☠️", "color": "#FF5722"}
-            ],
-            "recent_activity": await chat_repo.get_recent_chats(limit=10),
-            "data_source": "mongodb_realtime",
-            "last_updated": datetime.utcnow().isoformat() + "Z"
-        }
+        # Dashboards poll this endpoint; concurrent pollers share one query per TTL window
+        response_data = _risk_stats_cache.get("data")
+        if response_data is None:
+            async with _risk_stats_lock:
+                response_data = _risk_stats_cache.get("data")
+                if response_data is None:
+                    response_data = await _load_risk_statistics()
+                    _risk_stats_cache["data"] = response_data
         
         return BaseResponse(
             success=True,
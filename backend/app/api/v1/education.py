@@ -3,45 +3,68 @@
 Generate educational content for misinformation detection and digital literacy
 """
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta
+from collections import Counter
+from contextlib import suppress
+import asyncio
 import logging
+from cachetools import TTLCache
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, UpdateOne
 
 from app.core.auth import get_current_user
 from app.models.user import UserInDB
 from app.services.educational_content import (
-    educational_content_service, 
     generate_misinformation_explanation,
     generate_fact_checking_guide,
     generate_bias_awareness_content,
-    ContentType,
     DifficultyLevel
 )
+from app.services.content_cache import educational_content_cache
+from app.middleware.profiling import server_timing
+from app.core.config import settings
 from app.core.database import get_database_operations
 from app.schemas.base import BaseResponse
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/education", tags=["Educational Content"])
+router = APIRouter(prefix="/education", tags=["Educational Content"], default_response_class=ORJSONResponse)
+
+# Library saves are written in batches by a single background task
+_library_queue: Optional[asyncio.Queue] = None
+_library_writer: Optional[asyncio.Task] = None
+
+# Content reads are counted in memory and flushed to usage_count periodically
+_usage_counts: Counter = Counter()
+_usage_flusher: Optional[asyncio.Task] = None
+
+# Per-user statistics are reused across dashboard polls for a few seconds
+_content_stats_cache: TTLCache = TTLCache(
+    maxsize=settings.EDUCATION_STATS_CACHE_SIZE,
+    ttl=settings.EDUCATION_STATS_CACHE_TTL_SECONDS
+)
 
 # Request Models
 class MisinformationExplanationRequest(BaseModel):
     topic: str = Field(..., description="Topic or claim to explain")
     detected_issues: List[str] = Field(..., description="List of detected misinformation issues")
-    difficulty_level: str = Field("intermediate", description="Target difficulty level: beginner, intermediate, advanced")
+    difficulty_level: DifficultyLevel = Field(DifficultyLevel.INTERMEDIATE, description="Target difficulty level: beginner, intermediate, advanced")
     save_to_library: bool = Field(True, description="Save to educational content library")
 
 class FactCheckGuideRequest(BaseModel):
     content_category: str = Field(..., description="Content category (health, politics, technology, social)")
-    difficulty_level: str = Field("intermediate", description="Target difficulty level")
+    difficulty_level: DifficultyLevel = Field(DifficultyLevel.INTERMEDIATE, description="Target difficulty level")
     include_exercises: bool = Field(True, description="Include practice exercises")
     cultural_context: str = Field("indian", description="Cultural context for examples")
 
 class BiasAwarenessRequest(BaseModel):
     bias_types: List[str] = Field(..., description="Types of biases to address")
     cultural_context: str = Field("indian", description="Cultural context for examples")
-    difficulty_level: str = Field("intermediate", description="Target difficulty level")
+    difficulty_level: DifficultyLevel = Field(DifficultyLevel.INTERMEDIATE, description="Target difficulty level")
     include_interactive: bool = Field(True, description="Include interactive elements")
 
 class ContentLibraryRequest(BaseModel):
@@ -50,6 +73,8 @@ class ContentLibraryRequest(BaseModel):
     topic: Optional[str] = Field(None, description="Search by topic")
     limit: int = Field(20, description="Maximum results", ge=1, le=100)
     offset: int = Field(0, description="Offset for pagination", ge=0)
+    before: Optional[datetime] = Field(None, description="Only return content created before this time (pass the last item's created_at to page without an offset)")
+    after_id: Optional[str] = Field(None, description="The last item's content_id, breaking ties between items with the same created_at")
 
 # Response Models
 class EducationalContentResponse(BaseModel):
@@ -63,6 +88,10 @@ class EducationalContentResponse(BaseModel):
     sources: List[str] = Field(..., description="Educational sources and references")
     metadata: Dict[str, Any] = Field(..., description="Content metadata")
 
+# Fields copied from stored library documents into EducationalContentResponse
+EDUCATIONAL_CONTENT_FIELDS = tuple(EducationalContentResponse.model_fields)
+EDUCATIONAL_CONTENT_PROJECTION = {field: 1 for field in EDUCATIONAL_CONTENT_FIELDS}
+
 class ContentLibraryResponse(BaseModel):
     content_id: str = Field(..., description="Unique content identifier")
     title: str = Field(..., description="Content title")
@@ -73,6 +102,17 @@ class ContentLibraryResponse(BaseModel):
     usage_count: int = Field(..., description="Number of times accessed")
     rating: Optional[float] = Field(None, description="User rating")
 
+# Library listings only need the summary fields, not the content bodies
+LIBRARY_LIST_PROJECTION = {
+    'title': 1,
+    'content_type': 1,
+    'difficulty_level': 1,
+    'topic': 1,
+    'created_at': 1,
+    'usage_count': 1,
+    'rating': 1
+}
+
 class ContentStatsResponse(BaseModel):
     total_content: int = Field(..., description="Total content items")
     content_by_type: Dict[str, int] = Field(..., description="Content distribution by type")
@@ -83,7 +123,7 @@ class ContentStatsResponse(BaseModel):
 @router.post("/explain-misinformation", response_model=EducationalContentResponse)
 async def create_misinformation_explanation(
     request: MisinformationExplanationRequest,
-    background_tasks: BackgroundTasks,
+    http_response: Response,
     current_user: UserInDB = Depends(get_current_user)
 ):
     """
@@ -95,21 +135,24 @@ async def create_misinformation_explanation(
     try:
         logger.info(f"🎓 Generating misinformation explanation for topic: {request.topic}")
         
-        # Generate educational content
-        content = await generate_misinformation_explanation(
-            topic=request.topic,
-            detected_issues=request.detected_issues,
-            difficulty_level=request.difficulty_level
-        )
+        # Reuse content generated for an identical request
+        cache_key = educational_content_cache.make_key("explain-misinformation", request)
+        content = await educational_content_cache.get(cache_key)
+        http_response.headers["X-Cache"] = "MISS" if content is None else "HIT"
+        
+        if content is None:
+            # Generate educational content
+            with server_timing(http_response, "gen"):
+                content = await generate_misinformation_explanation(
+                    topic=request.topic,
+                    detected_issues=request.detected_issues,
+                    difficulty_level=request.difficulty_level
+                )
+            await educational_content_cache.set(cache_key, content)
         
         # Save to library if requested
         if request.save_to_library:
-            background_tasks.add_task(
-                _save_to_content_library,
-                content,
-                str(current_user.id),
-                request.topic
-            )
+            _queue_library_save(content, str(current_user.id), request.topic)
         
         # Convert to response format
         response = EducationalContentResponse(
@@ -134,7 +177,7 @@ async def create_misinformation_explanation(
 @router.post("/fact-check-guide", response_model=EducationalContentResponse)
 async def create_fact_check_guide(
     request: FactCheckGuideRequest,
-    background_tasks: BackgroundTasks,
+    http_response: Response,
     current_user: UserInDB = Depends(get_current_user)
 ):
     """
@@ -146,25 +189,29 @@ async def create_fact_check_guide(
     try:
         logger.info(f"🔍 Generating fact-checking guide for category: {request.content_category}")
         
-        # Generate fact-checking guide
-        content = await generate_fact_checking_guide(
-            content_category=request.content_category,
-            difficulty_level=request.difficulty_level
-        )
-        
-        # Enhance with cultural context if specified
-        if request.cultural_context != "general":
-            content.metadata["cultural_context"] = request.cultural_context
-            # Add cultural context to examples and tools
-            content = await _enhance_with_cultural_context(content, request.cultural_context)
+        # Reuse content generated for an identical request
+        cache_key = educational_content_cache.make_key("fact-check-guide", request)
+        content = await educational_content_cache.get(cache_key)
+        http_response.headers["X-Cache"] = "MISS" if content is None else "HIT"
+        
+        if content is None:
+            # Generate fact-checking guide
+            with server_timing(http_response, "gen"):
+                content = await generate_fact_checking_guide(
+                    content_category=request.content_category,
+                    difficulty_level=request.difficulty_level
+                )
+            
+            # Enhance with cultural context if specified
+            if request.cultural_context != "general":
+                content.metadata["cultural_context"] = request.cultural_context
+                # Add cultural context to examples and tools
+                content = await _enhance_with_cultural_context(content, request.cultural_context)
+            
+            await educational_content_cache.set(cache_key, content)
         
         # Save to library
-        background_tasks.add_task(
-            _save_to_content_library,
-            content,
-            str(current_user.id),
-            f"fact_checking_{request.content_category}"
-        )
+        _queue_library_save(content, str(current_user.id), f"fact_checking_{request.content_category}")
         
         response = EducationalContentResponse(
             title=content.title,
@@ -188,7 +235,7 @@ async def create_fact_check_guide(
 @router.post("/bias-awareness", response_model=EducationalContentResponse)
 async def create_bias_awareness_content(
     request: BiasAwarenessRequest,
-    background_tasks: BackgroundTasks,
+    http_response: Response,
     current_user: UserInDB = Depends(get_current_user)
 ):
     """
@@ -200,20 +247,23 @@ async def create_bias_awareness_content(
     try:
         logger.info(f"🧠 Generating bias awareness content for types: {request.bias_types}")
         
-        # Generate bias awareness content
-        content = await generate_bias_awareness_content(
-            bias_types=request.bias_types,
-            cultural_context=request.cultural_context,
-            difficulty_level=request.difficulty_level
-        )
+        # Reuse content generated for an identical request
+        cache_key = educational_content_cache.make_key("bias-awareness", request)
+        content = await educational_content_cache.get(cache_key)
+        http_response.headers["X-Cache"] = "MISS" if content is None else "HIT"
+        
+        if content is None:
+            # Generate bias awareness content
+            with server_timing(http_response, "gen"):
+                content = await generate_bias_awareness_content(
+                    bias_types=request.bias_types,
+                    cultural_context=request.cultural_context,
+                    difficulty_level=request.difficulty_level
+                )
+            await educational_content_cache.set(cache_key, content)
         
         # Save to library
-        background_tasks.add_task(
-            _save_to_content_library,
-            content,
-            str(current_user.id),
-            f"bias_awareness_{'-'.join(request.bias_types)}"
-        )
+        _queue_library_save(content, str(current_user.id), f"bias_awareness_{'-'.join(request.bias_types)}")
         
         response = EducationalContentResponse(
             title=content.title,
@@ -266,8 +316,22 @@ async def get_content_library(
         if request.topic:
             query_filter['$text'] = {'$search': request.topic}
         
+        # Continue after the last item of the previous page
+        if request.before and request.after_id:
+            try:
+                after_id = ObjectId(request.after_id)
+            except InvalidId:
+                raise HTTPException(status_code=400, detail="Invalid after_id")
+            # $or is already taken by the ownership filter
+            query_filter['$and'] = [{'$or': [
+                {'created_at': {'$lt': request.before}},
+                {'created_at': request.before, '_id': {'$lt': after_id}}
+            ]}]
+        elif request.before:
+            query_filter['created_at'] = {'$lt': request.before}
+        
         # Execute query with pagination
-        cursor = db_ops.db.educational_content.find(query_filter).sort('created_at', -1)
+        cursor = db_ops.db.educational_content.find(query_filter, LIBRARY_LIST_PROJECTION).sort([('created_at', -1), ('_id', -1)])
         
         if request.offset > 0:
             cursor = cursor.skip(request.offset)
@@ -276,23 +340,26 @@ async def get_content_library(
         
         results = await cursor.to_list(length=request.limit)
         
-        # Convert to response format
-        library_items = []
-        for result in results:
-            library_items.append(ContentLibraryResponse(
-                content_id=str(result['_id']),
-                title=result['title'],
-                content_type=result['content_type'],
-                difficulty_level=result['difficulty_level'],
-                topic=result['topic'],
-                created_at=result['created_at'].isoformat(),
-                usage_count=result.get('usage_count', 0),
-                rating=result.get('rating')
-            ))
+        # Convert to response format (orjson encodes created_at as ISO 8601 itself)
+        library_items = [
+            {
+                'content_id': str(result['_id']),
+                'title': result['title'],
+                'content_type': result['content_type'],
+                'difficulty_level': result['difficulty_level'],
+                'topic': result['topic'],
+                'created_at': result['created_at'],
+                'usage_count': result.get('usage_count', 0),
+                'rating': result.get('rating')
+            }
+            for result in results
+        ]
         
         logger.info(f"📚 Retrieved {len(library_items)} content items from library")
-        return library_items
+        return ORJSONResponse(library_items)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Failed to retrieve content library: {e}")
         raise HTTPException(status_code=500, detail=f"Library retrieval failed: {str(e)}")
@@ -308,50 +375,42 @@ async def get_content_by_id(
     Retrieve specific educational content by ID and increment usage counter.
     """
     try:
-        from bson import ObjectId
-        
+        oid = _parse_content_id(content_id)
         db_ops = await get_database_operations()
         
         # Find content by ID
-        content = await db_ops.db.educational_content.find_one({
-            '_id': ObjectId(content_id),
-            '$or': [
-                {'user_id': str(current_user.id)},
-                {'is_public': True}
-            ]
-        })
+        content = await db_ops.db.educational_content.find_one(
+            {
+                '_id': oid,
+                '$or': [
+                    {'user_id': str(current_user.id)},
+                    {'is_public': True}
+                ]
+            },
+            EDUCATIONAL_CONTENT_PROJECTION
+        )
         
         if not content:
             raise HTTPException(status_code=404, detail="Content not found")
         
-        # Increment usage counter
-        await db_ops.db.educational_content.update_one(
-            {'_id': ObjectId(content_id)},
-            {'$inc': {'usage_count': 1}}
-        )
+        # Increment usage counter (written by the background flusher)
+        _record_usage(content['_id'])
         
-        # Convert to response format
-        response = EducationalContentResponse(
-            title=content['title'],
-            content=content['content'],
-            content_type=content['content_type'],
-            difficulty_level=content['difficulty_level'],
-            key_points=content['key_points'],
-            examples=content['examples'],
-            interactive_elements=content['interactive_elements'],
-            sources=content['sources'],
-            metadata=content['metadata']
-        )
+        # Stored documents already have the response shape, so skip model validation
+        response = {field: content[field] for field in EDUCATIONAL_CONTENT_FIELDS}
         
         logger.info(f"📖 Retrieved content: {content['title']}")
-        return response
+        return ORJSONResponse(response)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Failed to retrieve content: {e}")
         raise HTTPException(status_code=500, detail=f"Content retrieval failed: {str(e)}")
 
 @router.get("/statistics", response_model=ContentStatsResponse)
 async def get_content_statistics(
+    http_response: Response,
     current_user: UserInDB = Depends(get_current_user)
 ):
     """
@@ -360,73 +419,65 @@ async def get_content_statistics(
     Get comprehensive statistics about educational content usage and trends.
     """
     try:
+        user_id = str(current_user.id)
+        response = _content_stats_cache.get(user_id)
+        if response is not None:
+            return response
+        
         db_ops = await get_database_operations()
         
         # Base query for user's accessible content
         base_query = {
             '$or': [
-                {'user_id': str(current_user.id)},
+                {'user_id': user_id},
                 {'is_public': True}
             ]
         }
         
-        # Get total content count
-        total_content = await db_ops.db.educational_content.count_documents(base_query)
-        
-        # Get content distribution by type
-        type_pipeline = [
-            {'$match': base_query},
-            {'$group': {'_id': '$content_type', 'count': {'$sum': 1}}}
-        ]
-        type_results = await db_ops.db.educational_content.aggregate(type_pipeline).to_list(length=None)
-        content_by_type = {result['_id']: result['count'] for result in type_results}
+        week_ago = datetime.utcnow() - timedelta(days=7)
         
-        # Get content distribution by difficulty
-        difficulty_pipeline = [
+        # Match the accessible content once and compute every counter from that pass
+        stats_pipeline = [
             {'$match': base_query},
-            {'$group': {'_id': '$difficulty_level', 'count': {'$sum': 1}}}
+            {'$facet': {
+                'total': [{'$count': 'count'}],
+                'by_type': [{'$group': {'_id': '$content_type', 'count': {'$sum': 1}}}],
+                'by_difficulty': [{'$group': {'_id': '$difficulty_level', 'count': {'$sum': 1}}}],
+                'popular_topics': [
+                    {'$group': {'_id': '$topic', 'count': {'$sum': 1}, 'total_usage': {'$sum': '$usage_count'}}},
+                    {'$sort': {'total_usage': -1}},
+                    {'$limit': 10}
+                ],
+                # Recent activity (last 7 days)
+                'new_last_7_days': [
+                    {'$match': {'created_at': {'$gte': week_ago}}},
+                    {'$count': 'count'}
+                ],
+                'usage_last_7_days': [
+                    {'$match': {'last_accessed': {'$gte': week_ago}}},
+                    {'$group': {'_id': None, 'total_usage': {'$sum': '$usage_count'}}}
+                ]
+            }}
         ]
-        difficulty_results = await db_ops.db.educational_content.aggregate(difficulty_pipeline).to_list(length=None)
-        content_by_difficulty = {result['_id']: result['count'] for result in difficulty_results}
+        with server_timing(http_response, "db"):
+            stats = (await db_ops.db.educational_content.aggregate(stats_pipeline).to_list(length=1))[0]
         
-        # Get popular topics
-        topic_pipeline = [
-            {'$match': base_query},
-            {'$group': {'_id': '$topic', 'count': {'$sum': 1}, 'total_usage': {'$sum': '$usage_count'}}},
-            {'$sort': {'total_usage': -1}},
-            {'$limit': 10}
-        ]
-        topic_results = await db_ops.db.educational_content.aggregate(topic_pipeline).to_list(length=10)
+        total_content = stats['total'][0]['count'] if stats['total'] else 0
+        content_by_type = {result['_id']: result['count'] for result in stats['by_type']}
+        content_by_difficulty = {result['_id']: result['count'] for result in stats['by_difficulty']}
         popular_topics = [
             {
                 'topic': result['_id'],
                 'content_count': result['count'],
                 'total_usage': result['total_usage']
             }
-            for result in topic_results
+            for result in stats['popular_topics']
         ]
-        
-        # Get recent activity (last 7 days)
-        from datetime import datetime, timedelta
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        
         recent_activity = {
-            'new_content_last_7_days': await db_ops.db.educational_content.count_documents({
-                **base_query,
-                'created_at': {'$gte': week_ago}
-            }),
-            'total_usage_last_7_days': await db_ops.db.educational_content.aggregate([
-                {'$match': {**base_query, 'last_accessed': {'$gte': week_ago}}},
-                {'$group': {'_id': None, 'total_usage': {'$sum': '$usage_count'}}}
-            ]).to_list(length=1)
+            'new_content_last_7_days': stats['new_last_7_days'][0]['count'] if stats['new_last_7_days'] else 0,
+            'total_usage_last_7_days': stats['usage_last_7_days'][0]['total_usage'] if stats['usage_last_7_days'] else 0
         }
         
-        # Extract total usage from aggregation result
-        if recent_activity['total_usage_last_7_days']:
-            recent_activity['total_usage_last_7_days'] = recent_activity['total_usage_last_7_days'][0]['total_usage']
-        else:
-            recent_activity['total_usage_last_7_days'] = 0
-        
         response = ContentStatsResponse(
             total_content=total_content,
             content_by_type=content_by_type,
@@ -434,6 +485,7 @@ async def get_content_statistics(
             popular_topics=popular_topics,
             recent_activity=recent_activity
         )
+        _content_stats_cache[user_id] = response
         
         logger.info(f"📊 Retrieved content statistics for user {current_user.id}")
         return response
@@ -458,89 +510,228 @@ async def rate_content(
         if rating < 1.0 or rating > 5.0:
             raise HTTPException(status_code=400, detail="Rating should be between 1.0 and 5.0")
         
-        from bson import ObjectId
-        
+        oid = _parse_content_id(content_id)
         db_ops = await get_database_operations()
         
-        # Check if content exists and user has access
-        content = await db_ops.db.educational_content.find_one({
-            '_id': ObjectId(content_id),
-            '$or': [
-                {'user_id': str(current_user.id)},
-                {'is_public': True}
-            ]
-        })
+        user_id = str(current_user.id)
+        now = datetime.utcnow()
         
-        if not content:
-            raise HTTPException(status_code=404, detail="Content not found")
-        
-        # Update or add rating
-        current_ratings = content.get('ratings', [])
-        user_rating_index = next((i for i, r in enumerate(current_ratings) if r['user_id'] == str(current_user.id)), None)
-        
-        if user_rating_index is not None:
-            # Update existing rating
-            current_ratings[user_rating_index]['rating'] = rating
-            current_ratings[user_rating_index]['updated_at'] = datetime.utcnow()
-        else:
-            # Add new rating
-            current_ratings.append({
-                'user_id': str(current_user.id),
-                'rating': rating,
-                'created_at': datetime.utcnow()
-            })
-        
-        # Calculate average rating
-        avg_rating = sum(r['rating'] for r in current_ratings) / len(current_ratings)
-        
-        # Update content with new ratings
-        await db_ops.db.educational_content.update_one(
-            {'_id': ObjectId(content_id)},
+        # Upsert the user's rating and recompute the average in one atomic update
+        content = await db_ops.db.educational_content.find_one_and_update(
             {
-                '$set': {
-                    'ratings': current_ratings,
-                    'rating': round(avg_rating, 2)
-                }
-            }
+                '_id': oid,
+                '$or': [
+                    {'user_id': user_id},
+                    {'is_public': True}
+                ]
+            },
+            _rating_update_pipeline(user_id, rating, now),
+            projection={'rating': 1},
+            return_document=ReturnDocument.AFTER
         )
         
+        if not content:
+            raise HTTPException(status_code=404, detail="Content not found")
+        
+        avg_rating = content['rating']
         logger.info(f"⭐ Content {content_id} rated {rating} by user {current_user.id}")
-        return {"message": "Rating submitted successfully", "average_rating": round(avg_rating, 2)}
+        return {"message": "Rating submitted successfully", "average_rating": avg_rating}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Failed to rate content: {e}")
         raise HTTPException(status_code=500, detail=f"Rating submission failed: {str(e)}")
 
-# Background task functions
-async def _save_to_content_library(content, user_id: str, topic: str):
-    """Save educational content to the library"""
+def _rating_update_pipeline(user_id: str, rating: float, now: datetime) -> List[Dict[str, Any]]:
+    """
+    Build the update that stores user_id's rating and maintains the running average
+    
+    Ratings live in a ratings_map keyed by user id next to rating_sum/rating_count,
+    so a rating touches one entry and the average is adjusted by the delta.
+    Documents still holding the old ratings array are converted on their first rating.
+    """
+    # User ids are ObjectId hex strings, so they are safe to embed in field paths
+    previous = f'$ratings_map.{user_id}'
+    return [
+        {'$set': {
+            'ratings_map': {'$ifNull': ['$ratings_map', {'$arrayToObject': {'$map': {
+                'input': {'$ifNull': ['$ratings', []]},
+                'in': {'k': '$$this.user_id', 'v': {
+                    'rating': '$$this.rating',
+                    'created_at': '$$this.created_at',
+                    'updated_at': '$$this.updated_at'
+                }}
+            }}}]},
+            'rating_sum': {'$ifNull': ['$rating_sum', {'$sum': '$ratings.rating'}]},
+            'rating_count': {'$ifNull': ['$rating_count', {'$size': {'$ifNull': ['$ratings', []]}}]}
+        }},
+        {'$unset': 'ratings'},
+        {'$set': {
+            'rating_sum': {'$subtract': [{'$add': ['$rating_sum', rating]}, {'$ifNull': [f'{previous}.rating', 0]}]},
+            'rating_count': {'$add': ['$rating_count', {'$cond': [{'$eq': [{'$ifNull': [previous, None]}, None]}, 1, 0]}]},
+            f'ratings_map.{user_id}': {
+                'rating': rating,
+                'created_at': {'$ifNull': [f'{previous}.created_at', now]},
+                'updated_at': now
+            }
+        }},
+        {'$set': {'rating': {'$round': [{'$divide': ['$rating_sum', '$rating_count']}, 2]}}}
+    ]
+
+def _parse_content_id(content_id: str) -> ObjectId:
+    """Parse a library content id, rejecting malformed ids with a 400"""
+    try:
+        return ObjectId(content_id)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid content_id")
+
+# Background library writer
+def _content_library_doc(content, user_id: str, topic: str) -> Dict[str, Any]:
+    """Build the educational_content document for generated content"""
+    now = datetime.utcnow()
+    return {
+        'user_id': user_id,
+        'title': content.title,
+        'content': content.content,
+        'content_type': content.content_type.value,
+        'difficulty_level': content.difficulty_level.value,
+        'topic': topic,
+        'key_points': content.key_points,
+        'examples': content.examples,
+        'interactive_elements': content.interactive_elements,
+        'sources': content.sources,
+        'metadata': content.metadata,
+        'usage_count': 0,
+        'ratings_map': {},
+        'rating_sum': 0,
+        'rating_count': 0,
+        'is_public': False,  # Private by default
+        'created_at': now,
+        'last_accessed': now
+    }
+
+def _queue_library_save(content, user_id: str, topic: str) -> None:
+    """Hand generated content to the background library writer"""
+    try:
+        queue = start_library_writer()
+        content_doc = _content_library_doc(content, user_id, topic)
+        if queue.full():
+            dropped = queue.get_nowait()
+            if dropped is None:
+                # The writer is stopping; keep its shutdown sentinel and drop the new content instead
+                queue.put_nowait(None)
+                logger.warning(f"⚠️ Content library writer is stopping, dropped: {content_doc['title']}")
+                return
+            logger.warning(f"⚠️ Content library queue full, dropped: {dropped['title']}")
+        queue.put_nowait(content_doc)
+    except Exception as e:
+        logger.error(f"❌ Failed to queue content for the library: {e}")
+
+async def _write_library_batch(batch: List[Dict[str, Any]]) -> None:
+    """Save a batch of content documents to the library with a single insert"""
     try:
         db_ops = await get_database_operations()
+        await db_ops.db.educational_content.insert_many(batch, ordered=False)
+        logger.info(f"📚 Saved {len(batch)} educational content items to library")
         
-        content_doc = {
-            'user_id': user_id,
-            'title': content.title,
-            'content': content.content,
-            'content_type': content.content_type.value,
-            'difficulty_level': content.difficulty_level.value,
-            'topic': topic,
-            'key_points': content.key_points,
-            'examples': content.examples,
-            'interactive_elements': content.interactive_elements,
-            'sources': content.sources,
-            'metadata': content.metadata,
-            'usage_count': 0,
-            'ratings': [],
-            'is_public': False,  # Private by default
-            'created_at': datetime.utcnow(),
-            'last_accessed': datetime.utcnow()
-        }
-        
-        await db_ops.db.educational_content.insert_one(content_doc)
-        logger.info(f"📚 Saved educational content to library: {content.title}")
+        # New content changes its owner's statistics
+        for user_id in {content_doc['user_id'] for content_doc in batch}:
+            _content_stats_cache.pop(user_id, None)
         
     except Exception as e:
-        logger.error(f"❌ Failed to save content to library: {e}")
+        logger.error(f"❌ Failed to save {len(batch)} content items to library: {e}")
+
+async def _run_library_writer(queue: asyncio.Queue) -> None:
+    """Drain the library queue in batches until the None sentinel arrives"""
+    batch_size = settings.LIBRARY_SAVE_BATCH_SIZE
+    flush_interval = settings.LIBRARY_SAVE_FLUSH_INTERVAL_MS / 1000
+    
+    while True:
+        content_doc = await queue.get()
+        if content_doc is None:
+            return
+        batch = [content_doc]
+        
+        # Give a partial batch a moment to fill before writing it
+        if queue.qsize() < batch_size - 1:
+            await asyncio.sleep(flush_interval)
+        
+        closing = False
+        while len(batch) < batch_size and not queue.empty():
+            content_doc = queue.get_nowait()
+            if content_doc is None:
+                closing = True
+                break
+            batch.append(content_doc)
+        
+        await _write_library_batch(batch)
+        if closing:
+            return
+
+def _record_usage(content_id) -> None:
+    """Count a content read for the next usage flush"""
+    _usage_counts[content_id] += 1
+    start_library_writer()
+
+async def _flush_usage_counts() -> None:
+    """Apply the accumulated usage counts with a single bulk write"""
+    global _usage_counts
+    if not _usage_counts:
+        return
+    counts, _usage_counts = _usage_counts, Counter()
+    
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne({'_id': content_id}, {'$inc': {'usage_count': count}, '$max': {'last_accessed': now}})
+        for content_id, count in counts.items()
+    ]
+    try:
+        db_ops = await get_database_operations()
+        await db_ops.db.educational_content.bulk_write(operations, ordered=False)
+    except asyncio.CancelledError:
+        # Stopped mid-flush; leave the counts for the final flush
+        _usage_counts.update(counts)
+        raise
+    except Exception as e:
+        logger.error(f"❌ Failed to flush usage counts for {len(counts)} content items: {e}")
+        # Keep the counts for the next flush
+        _usage_counts.update(counts)
+
+async def _run_usage_flusher() -> None:
+    """Periodically write accumulated usage counts to the library"""
+    while True:
+        await asyncio.sleep(settings.LIBRARY_USAGE_FLUSH_INTERVAL_SECONDS)
+        await _flush_usage_counts()
+
+def start_library_writer() -> asyncio.Queue:
+    """Start the background content library writer and usage flusher if they are not running"""
+    global _library_queue, _library_writer, _usage_flusher
+    if _library_writer is None or _library_writer.done():
+        _library_queue = asyncio.Queue(maxsize=settings.TASK_QUEUE_SIZE)
+        _library_writer = asyncio.create_task(_run_library_writer(_library_queue))
+    if _usage_flusher is None or _usage_flusher.done():
+        _usage_flusher = asyncio.create_task(_run_usage_flusher())
+    return _library_queue
+
+async def stop_library_writer() -> None:
+    """Flush queued library saves and usage counts, then stop the background tasks"""
+    global _library_queue, _library_writer, _usage_flusher
+    if _library_writer is None:
+        return
+    if not _library_writer.done():
+        await _library_queue.put(None)
+        await _library_writer
+    _library_queue = None
+    _library_writer = None
+    
+    if _usage_flusher is not None:
+        _usage_flusher.cancel()
+        # Let a flush in progress put its counts back before the final flush
+        with suppress(asyncio.CancelledError):
+            await _usage_flusher
+        _usage_flusher = None
+    await _flush_usage_counts()
 
 async def _enhance_with_cultural_context(content, cultural_context: str):
     """Enhance content with cultural context"""
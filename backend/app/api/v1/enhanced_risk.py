@@ -4,10 +4,16 @@ Comprehensive AI safety analysis with hallucination and adversarial detection
 """
 
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
+from datetime import datetime, timedelta
+import asyncio
 import logging
 
+from bson import ObjectId
+from bson.errors import InvalidId
+
 from app.core.auth import get_current_user
 from app.models.user import UserInDB
 from app.services.enhanced_risk_detection import enhanced_risk_service, assess_content_risk
@@ -32,6 +38,17 @@ class RiskHistoryRequest(BaseModel):
     severity_filter: Optional[str] = Field(None, description="Filter by severity: minimal, low, medium, high, critical")
     limit: int = Field(50, description="Maximum number of results", ge=1, le=1000)
     offset: int = Field(0, description="Offset for pagination", ge=0)
+    after: Optional[datetime] = Field(None, description="Only return assessments created before this time (pass the last item's created_at to page without an offset)")
+    after_id: Optional[str] = Field(None, description="The last item's _id, breaking ties between assessments with the same created_at")
+
+# History listings only need the summary fields, not the per-category detection payloads
+RISK_HISTORY_PROJECTION = {
+    'overall_risk_score': 1,
+    'risk_severity': 1,
+    'processing_safe': 1,
+    'requires_human_review': 1,
+    'created_at': 1
+}
 
 # Response Models
 class RiskCategoryResponse(BaseModel):
@@ -65,6 +82,27 @@ class RiskStatisticsResponse(BaseModel):
     category_statistics: Dict[str, Dict[str, Any]] = Field(..., description="Statistics by risk category")
     recent_trends: Dict[str, Any] = Field(..., description="Recent risk trends")
 
+def _assessment_response(result, include_mitigation: bool = True) -> RiskAssessmentResponse:
+    """Build the response for a trusted service result without re-validating it"""
+    risk_categories = {
+        category: RiskCategoryResponse.model_construct(
+            score=data['score'],
+            detected=data['detected'],
+            details=data.get('details') if include_mitigation else None
+        )
+        for category, data in result.risk_categories.items()
+    }
+    
+    return RiskAssessmentResponse.model_construct(
+        overall_risk_score=result.overall_risk_score,
+        risk_severity=result.risk_severity.value,
+        risk_categories=risk_categories,
+        processing_safe=result.processing_safe,
+        requires_human_review=result.requires_human_review,
+        mitigation_actions=result.mitigation_actions if include_mitigation else [],
+        metadata=result.metadata
+    )
+
 @router.post("/assess", response_model=RiskAssessmentResponse)
 async def assess_content_risk_endpoint(
     request: RiskAssessmentRequest,
@@ -91,27 +129,10 @@ async def assess_content_risk_endpoint(
             source_documents=request.source_documents
         )
         
-        # Convert to response format
-        risk_categories = {}
-        for category, data in result.risk_categories.items():
-            risk_categories[category] = RiskCategoryResponse(
-                score=data['score'],
-                detected=data['detected'],
-                details=data.get('details') if request.include_mitigation else None
-            )
-        
-        response = RiskAssessmentResponse(
-            overall_risk_score=result.overall_risk_score,
-            risk_severity=result.risk_severity.value,
-            risk_categories=risk_categories,
-            processing_safe=result.processing_safe,
-            requires_human_review=result.requires_human_review,
-            mitigation_actions=result.mitigation_actions if request.include_mitigation else [],
-            metadata=result.metadata
-        )
+        response = _assessment_response(result, include_mitigation=request.include_mitigation)
         
         logger.info(f"✅ Risk assessment completed. Score: {result.overall_risk_score:.3f}")
-        return response
+        return ORJSONResponse(response.model_dump(warnings=False))
         
     except Exception as e:
         logger.error(f"❌ Risk assessment failed: {e}")
@@ -130,68 +151,45 @@ async def bulk_risk_assessment(
     Useful for batch processing and content moderation workflows.
     """
     try:
-        import asyncio
-        from datetime import datetime
-        
         start_time = datetime.utcnow()
         logger.info(f"📊 Bulk risk assessment requested by user {current_user.id} for {len(request.items)} items")
         
-        # Process items in batches to avoid overwhelming the system
-        results = []
-        batch_size = min(request.max_parallel, len(request.items))
-        
-        for i in range(0, len(request.items), batch_size):
-            batch = request.items[i:i + batch_size]
-            
-            # Create tasks for parallel processing
-            tasks = []
-            for item in batch:
-                task = assess_content_risk(
+        # Cap in-flight assessments without waiting on the slowest item of a batch
+        semaphore = asyncio.Semaphore(request.max_parallel)
+        
+        async def assess_item(item: RiskAssessmentRequest):
+            async with semaphore:
+                return await assess_content_risk(
                     content=item.content,
                     context=item.context,
                     user_id=str(current_user.id),
                     source_documents=item.source_documents
                 )
-                tasks.append(task)
-            
-            # Execute batch in parallel
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Process results
-            for j, result in enumerate(batch_results):
-                if isinstance(result, Exception):
-                    logger.error(f"❌ Error processing item {i+j}: {result}")
-                    # Create error response
-                    error_response = RiskAssessmentResponse(
-                        overall_risk_score=1.0,  # Max risk for errors
-                        risk_severity="critical",
-                        risk_categories={},
-                        processing_safe=False,
-                        requires_human_review=True,
-                        mitigation_actions=["Manual review required due to processing error"],
-                        metadata={"error": str(result)}
-                    )
-                    results.append(error_response)
-                else:
-                    # Convert successful result
-                    risk_categories = {}
-                    for category, data in result.risk_categories.items():
-                        risk_categories[category] = RiskCategoryResponse(
-                            score=data['score'],
-                            detected=data['detected'],
-                            details=data.get('details')
-                        )
-                    
-                    response = RiskAssessmentResponse(
-                        overall_risk_score=result.overall_risk_score,
-                        risk_severity=result.risk_severity.value,
-                        risk_categories=risk_categories,
-                        processing_safe=result.processing_safe,
-                        requires_human_review=result.requires_human_review,
-                        mitigation_actions=result.mitigation_actions,
-                        metadata=result.metadata
-                    )
-                    results.append(response)
+        
+        # gather returns results in submission order
+        item_results = await asyncio.gather(
+            *(assess_item(item) for item in request.items),
+            return_exceptions=True
+        )
+        
+        # Process results
+        results = []
+        for i, result in enumerate(item_results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Error processing item {i}: {result}")
+                # Create error response
+                error_response = RiskAssessmentResponse.model_construct(
+                    overall_risk_score=1.0,  # Max risk for errors
+                    risk_severity="critical",
+                    risk_categories={},
+                    processing_safe=False,
+                    requires_human_review=True,
+                    mitigation_actions=["Manual review required due to processing error"],
+                    metadata={"error": str(result)}
+                )
+                results.append(error_response)
+            else:
+                results.append(_assessment_response(result))
         
         # Calculate summary statistics
         processing_time = (datetime.utcnow() - start_time).total_seconds()
@@ -214,11 +212,11 @@ async def bulk_risk_assessment(
         
         logger.info(f"✅ Bulk assessment completed. {total_items} items processed in {processing_time:.2f}s")
         
-        return BulkRiskAssessmentResponse(
-            results=results,
-            summary=summary,
-            processing_time=processing_time
-        )
+        return ORJSONResponse({
+            'results': [r.model_dump(warnings=False) for r in results],
+            'summary': summary,
+            'processing_time': processing_time
+        })
         
     except Exception as e:
         logger.error(f"❌ Bulk risk assessment failed: {e}")
@@ -233,8 +231,6 @@ async def get_system_status():
     including available detectors and performance metrics.
     """
     try:
-        from datetime import datetime
-        
         # Check detector availability
         detectors_available = {
             'hallucination_detector': enhanced_risk_service.hallucination_detector is not None,
@@ -290,26 +286,40 @@ async def get_risk_assessment_history(
         if request.severity_filter:
             query_filter['risk_severity'] = request.severity_filter.lower()
         
+        # Continue after the last item of the previous page
+        if request.after and request.after_id:
+            try:
+                after_id = ObjectId(request.after_id)
+            except InvalidId:
+                raise HTTPException(status_code=400, detail="Invalid after_id")
+            query_filter['$or'] = [
+                {'created_at': {'$lt': request.after}},
+                {'created_at': request.after, '_id': {'$lt': after_id}}
+            ]
+        elif request.after:
+            query_filter['created_at'] = {'$lt': request.after}
+        
         # Execute query with pagination
-        cursor = db_ops.db.enhanced_risk_assessments.find(query_filter).sort('created_at', -1)
+        cursor = db_ops.db.enhanced_risk_assessments.find(query_filter, RISK_HISTORY_PROJECTION).sort([('created_at', -1), ('_id', -1)])
         
         if request.offset > 0:
             cursor = cursor.skip(request.offset)
         
-        cursor = cursor.limit(request.limit)
+        # Fetch the whole page in a single batch
+        cursor = cursor.limit(request.limit).batch_size(request.limit)
         
         results = await cursor.to_list(length=request.limit)
         
-        # Convert ObjectId to string for JSON serialization
         for result in results:
-            if '_id' in result:
-                result['_id'] = str(result['_id'])
+            result['_id'] = str(result['_id'])
             if 'created_at' in result:
                 result['created_at'] = result['created_at'].isoformat()
         
         logger.info(f"📊 Retrieved {len(results)} risk assessment records for user {current_user.id}")
-        return results
+        return ORJSONResponse(results)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Failed to retrieve risk history: {e}")
         raise HTTPException(status_code=500, detail=f"History retrieval failed: {str(e)}")
@@ -329,75 +339,54 @@ async def get_risk_statistics(
         # Base query (user-specific unless admin)
         base_query = {} if current_user.role == "admin" else {'user_id': str(current_user.id)}
         
-        # Get total count
-        total_assessments = await db_ops.db.enhanced_risk_assessments.count_documents(base_query)
-        
-        # Get risk distribution by severity
-        severity_pipeline = [
-            {'$match': base_query},
-            {'$group': {'_id': '$risk_severity', 'count': {'$sum': 1}}}
-        ]
-        
-        severity_results = await db_ops.db.enhanced_risk_assessments.aggregate(severity_pipeline).to_list(length=None)
-        risk_distribution = {result['_id']: result['count'] for result in severity_results}
+        week_ago = datetime.utcnow() - timedelta(days=7)
         
-        # Get category statistics
-        category_pipeline = [
+        # Match the accessible assessments once and compute every counter from that pass
+        stats_pipeline = [
             {'$match': base_query},
-            {'$project': {
-                'hallucination_detected': '$risk_categories.hallucination.detected',
-                'adversarial_detected': '$risk_categories.adversarial.detected',
-                'pii_detected': '$risk_categories.pii.detected',
-                'bias_detected': '$risk_categories.bias.detected'
-            }},
-            {'$group': {
-                '_id': None,
-                'hallucination_count': {'$sum': {'$cond': ['$hallucination_detected', 1, 0]}},
-                'adversarial_count': {'$sum': {'$cond': ['$adversarial_detected', 1, 0]}},
-                'pii_count': {'$sum': {'$cond': ['$pii_detected', 1, 0]}},
-                'bias_count': {'$sum': {'$cond': ['$bias_detected', 1, 0]}}
+            {'$facet': {
+                'total': [{'$count': 'count'}],
+                'by_severity': [{'$group': {'_id': '$risk_severity', 'count': {'$sum': 1}}}],
+                'by_category': [
+                    {'$group': {
+                        '_id': None,
+                        'hallucination_count': {'$sum': {'$cond': ['$risk_categories.hallucination.detected', 1, 0]}},
+                        'adversarial_count': {'$sum': {'$cond': ['$risk_categories.adversarial.detected', 1, 0]}},
+                        'pii_count': {'$sum': {'$cond': ['$risk_categories.pii.detected', 1, 0]}},
+                        'bias_count': {'$sum': {'$cond': ['$risk_categories.bias.detected', 1, 0]}}
+                    }}
+                ],
+                # Recent trends (last 7 days)
+                'last_7_days': [
+                    {'$match': {'created_at': {'$gte': week_ago}}},
+                    {'$count': 'count'}
+                ],
+                'high_risk_last_7_days': [
+                    {'$match': {'created_at': {'$gte': week_ago}, 'risk_severity': {'$in': ['high', 'critical']}}},
+                    {'$count': 'count'}
+                ]
             }}
         ]
+        stats = (await db_ops.db.enhanced_risk_assessments.aggregate(stats_pipeline).to_list(length=1))[0]
         
-        category_results = await db_ops.db.enhanced_risk_assessments.aggregate(category_pipeline).to_list(length=1)
+        total_assessments = stats['total'][0]['count'] if stats['total'] else 0
+        risk_distribution = {result['_id']: result['count'] for result in stats['by_severity']}
         
-        if category_results:
-            category_stats = category_results[0]
+        if stats['by_category']:
+            category_stats = stats['by_category'][0]
             category_statistics = {
-                'hallucination': {
-                    'detections': category_stats.get('hallucination_count', 0),
-                    'rate': category_stats.get('hallucination_count', 0) / total_assessments if total_assessments > 0 else 0
-                },
-                'adversarial': {
-                    'detections': category_stats.get('adversarial_count', 0),
-                    'rate': category_stats.get('adversarial_count', 0) / total_assessments if total_assessments > 0 else 0
-                },
-                'pii': {
-                    'detections': category_stats.get('pii_count', 0),
-                    'rate': category_stats.get('pii_count', 0) / total_assessments if total_assessments > 0 else 0
-                },
-                'bias': {
-                    'detections': category_stats.get('bias_count', 0),
-                    'rate': category_stats.get('bias_count', 0) / total_assessments if total_assessments > 0 else 0
+                category: {
+                    'detections': category_stats.get(f'{category}_count', 0),
+                    'rate': category_stats.get(f'{category}_count', 0) / total_assessments if total_assessments > 0 else 0
                 }
+                for category in ('hallucination', 'adversarial', 'pii', 'bias')
             }
         else:
             category_statistics = {}
         
-        # Get recent trends (last 7 days)
-        from datetime import datetime, timedelta
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        
         recent_trends = {
-            'assessments_last_7_days': await db_ops.db.enhanced_risk_assessments.count_documents({
-                **base_query,
-                'created_at': {'$gte': week_ago}
-            }),
-            'high_risk_last_7_days': await db_ops.db.enhanced_risk_assessments.count_documents({
-                **base_query,
-                'created_at': {'$gte': week_ago},
-                'risk_severity': {'$in': ['high', 'critical']}
-            })
+            'assessments_last_7_days': stats['last_7_days'][0]['count'] if stats['last_7_days'] else 0,
+            'high_risk_last_7_days': stats['high_risk_last_7_days'][0]['count'] if stats['high_risk_last_7_days'] else 0
         }
         
         return RiskStatisticsResponse(
@@ -431,15 +420,21 @@ async def test_detection_system(
             'clean_test': "This is a normal piece of text without any risks or issues."
         }
         
-        test_results = {}
+        # Run every probe concurrently; gather returns results in test case order
+        probe_results = await asyncio.gather(
+            *(assess_content_risk(content=test_content, user_id=str(current_user.id)) for test_content in test_cases.values()),
+            return_exceptions=True
+        )
         
-        for test_name, test_content in test_cases.items():
-            try:
-                result = await assess_content_risk(
-                    content=test_content,
-                    user_id=str(current_user.id)
-                )
-                
+        test_results = {}
+        for (test_name, test_content), result in zip(test_cases.items(), probe_results):
+            if isinstance(result, Exception):
+                test_results[test_name] = {
+                    'content': test_content[:50] + "..." if len(test_content) > 50 else test_content,
+                    'error': str(result),
+                    'test_passed': False
+                }
+            else:
                 test_results[test_name] = {
                     'content': test_content[:50] + "..." if len(test_content) > 50 else test_content,
                     'overall_risk_score': result.overall_risk_score,
@@ -448,13 +443,6 @@ async def test_detection_system(
                     'categories_detected': [cat for cat, data in result.risk_categories.items() if data['detected']],
                     'test_passed': True
                 }
-                
-            except Exception as e:
-                test_results[test_name] = {
-                    'content': test_content[:50] + "..." if len(test_content) > 50 else test_content,
-                    'error': str(e),
-                    'test_passed': False
-                }
         
         # Calculate overall test summary
         total_tests = len(test_cases)
@@ -2,9 +2,11 @@
 JWT Authentication and password hashing utilities
 """
 
+import hashlib
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
@@ -25,6 +27,12 @@ pwd_context = CryptContext(
 # HTTP Bearer token security
 security = HTTPBearer()
 
+# Recently verified token payloads, keyed by a digest of the raw token
+_token_cache: TTLCache = TTLCache(
+    maxsize=settings.JWT_VERIFY_CACHE_SIZE,
+    ttl=settings.JWT_VERIFY_CACHE_TTL_SECONDS
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -100,6 +108,24 @@ def verify_token(token: str) -> Optional[TokenData]:
         return None
 
 
+def get_cached_token_payload(token: str) -> Optional[TokenData]:
+    """Verify a JWT token, reusing the result of a recent successful verification"""
+    key = hashlib.sha256(token.encode()).hexdigest()[:32]
+    token_data = _token_cache.get(key)
+    if token_data is not None:
+        # The signature was already checked, but the token may have expired since
+        if token_data.exp > datetime.now(timezone.utc):
+            return token_data
+        _token_cache.pop(key, None)
+        return None
+    
+    token_data = verify_token(token)
+    # Failures are never cached so a bad token always takes the full path
+    if token_data is not None:
+        _token_cache[key] = token_data
+    return token_data
+
+
 async def get_current_user_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
     """Get current user from JWT token"""
     credentials_exception = HTTPException(
@@ -108,7 +134,7 @@ async def get_current_user_token(credentials: HTTPAuthorizationCredentials = Dep
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    token_data = verify_token(credentials.credentials)
+    token_data = get_cached_token_payload(credentials.credentials)
     if token_data is None:
         raise credentials_exception
     
@@ -166,7 +192,7 @@ async def get_current_admin_user(current_user: UserInDB = Depends(get_current_us
 async def get_current_user_from_token(token: str) -> Optional[UserInDB]:
     """Get current user from JWT token string (for middleware use)"""
     try:
-        token_data = verify_token(token)
+        token_data = get_cached_token_payload(token)
         if token_data is None:
             return None
         
@@ -76,13 +76,17 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7  # 7 days for refresh token
+    JWT_VERIFY_CACHE_TTL_SECONDS: int = 30  # Reuse verified token payloads briefly
+    JWT_VERIFY_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60  # Per worker; bounds how long other workers may see a revoked user
+    USER_CACHE_SIZE: int = 5000
     API_KEY_PREFIX: str = "airms_"
     
     # PII Security Settings
     PII_SALT_LENGTH: int = 32
     PII_ENCRYPTION_KEY: str = secrets.token_urlsafe(32)
     PII_TOKEN_EXPIRY_DAYS: int = 90  # 90-day retention policy
-    PII_HASH_ALGORITHM: str = "sha256"  # Hash algorithm for PII tokenization
+    PII_HASH_ALGORITHM: str = "sha256"  # Hash algorithm for PII tokenization (sha256, blake2b, blake3 if installed)
     PII_ENABLE_REVERSE_LOOKUP: bool = True  # Enable reverse lookup for detokenization
     
     # === RISK DETECTION SETTINGS ===
@@ -103,6 +107,11 @@ class Settings(BaseSettings):
     ENABLE_PII_DETECTION: bool = True
     ENABLE_ADVERSARIAL_DETECTION: bool = True
     ENABLE_MISINFORMATION_DETECTION: bool = True
+    SKIP_LLM_ON_CRITICAL: bool = True  # Answer critical-risk chat input with the blocking template directly
+    ENABLE_PROFILING: bool = False  # Server-Timing headers and X-Profile request profiling
+    
+    # Pattern Engine
+    RISK_PATTERN_CACHE_DIR: Optional[str] = None  # Shared dir for compiled Hyperscan databases (disabled if unset)
     
     # === PII PATTERNS ===
     PII_PATTERNS: Dict[str, str] = {
@@ -169,17 +178,30 @@ class Settings(BaseSettings):
     ENABLE_BACKGROUND_TASKS: bool = True
     TASK_QUEUE_SIZE: int = 1000
     MAX_CONCURRENT_TASKS: int = 10
+    CHAT_LOG_BATCH_SIZE: int = 200  # Max chat logs per insert_many
+    CHAT_LOG_FLUSH_INTERVAL_MS: int = 50  # Wait for a partial batch to fill
+    RISK_LOG_PROJECTION_INTERVAL_SECONDS: int = 5  # How often risk_logs is derived from chat_logs
+    LIBRARY_SAVE_BATCH_SIZE: int = 100  # Max educational content documents per insert_many
+    LIBRARY_SAVE_FLUSH_INTERVAL_MS: int = 250  # Wait for a partial library batch to fill
+    LIBRARY_USAGE_FLUSH_INTERVAL_SECONDS: int = 5  # How often buffered content reads are added to usage_count
+    RISK_ASSESSMENT_BATCH_SIZE: int = 100  # Max enhanced risk assessments per insert_many
+    RISK_ASSESSMENT_FLUSH_INTERVAL_MS: int = 25  # Wait for a partial assessment batch to fill
     
     # === ANALYTICS SETTINGS ===
     ENABLE_ANALYTICS: bool = True
     ANALYTICS_RETENTION_DAYS: int = 90
     ENABLE_REAL_TIME_STATS: bool = True
     STATS_UPDATE_INTERVAL_SECONDS: int = 30
+    RISK_STATS_CACHE_TTL_SECONDS: int = 5  # Reuse chat risk statistics across dashboard polls
     
     # === CACHE SETTINGS ===
     ENABLE_REDIS_CACHE: bool = False
     REDIS_URL: Optional[str] = "redis://localhost:6379"
     CACHE_TTL_SECONDS: int = 3600
+    EDUCATION_CONTENT_CACHE_SIZE: int = 512  # Generated educational content entries kept per process
+    EDUCATION_CONTENT_CACHE_TTL_SECONDS: int = 14400
+    EDUCATION_STATS_CACHE_SIZE: int = 1024  # Users whose content statistics are kept per process
+    EDUCATION_STATS_CACHE_TTL_SECONDS: int = 45
     
     # Model Config
     model_config = SettingsConfigDict(
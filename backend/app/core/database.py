@@ -11,7 +11,7 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any, Union
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
 from pymongo.errors import DuplicateKeyError, ConnectionFailure
-from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
 from bson import ObjectId
 from .config import settings
 
@@ -192,6 +192,35 @@ class MongoDB:
             ]
             await self.database.analytics.create_indexes(analytics_indexes)
             
+            # Chat log indexes (recent activity). The /risk-stats totals scan the whole
+            # collection in a $facet, which cannot use indexes, so none are kept for them
+            chat_log_indexes = [
+                IndexModel([("created_at", DESCENDING)])
+            ]
+            await self.database.chat_logs.create_indexes(chat_log_indexes)
+            
+            # Risk log indexes (time-windowed dashboard summaries)
+            risk_log_indexes = [
+                IndexModel([("timestamp", DESCENDING), ("risk_level", ASCENDING)]),
+                IndexModel([("created_at", DESCENDING)])
+            ]
+            await self.database.risk_logs.create_indexes(risk_log_indexes)
+            
+            # Educational content indexes (one per clause of the owner-or-public filter, plus library search)
+            educational_content_indexes = [
+                IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+                IndexModel([("is_public", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+                IndexModel([("title", TEXT), ("topic", TEXT), ("content", TEXT)])
+            ]
+            await self.database.educational_content.create_indexes(educational_content_indexes)
+            
+            # Enhanced risk assessment indexes (per-user history keyset, optionally filtered by severity)
+            enhanced_risk_assessment_indexes = [
+                IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+                IndexModel([("user_id", ASCENDING), ("risk_severity", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+            ]
+            await self.database.enhanced_risk_assessments.create_indexes(enhanced_risk_assessment_indexes)
+            
             logger.info("📊 Database indexes created successfully")
             
         except Exception as e:
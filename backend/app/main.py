@@ -7,6 +7,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from bson.errors import InvalidId
 
 from app.core.config import settings
 from app.core.database import mongodb
@@ -30,8 +31,53 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ MongoDB connection failed: {e}")
     
+    # Start the background chat log writer
+    try:
+        from app.api.v1.chat import start_chat_log_writer
+        start_chat_log_writer()
+        logger.info("✅ Chat log writer started")
+    except Exception as e:
+        logger.error(f"❌ Chat log writer failed to start: {e}")
+    
+    # Start the background content library writer
+    try:
+        from app.api.v1.education import start_library_writer
+        start_library_writer()
+        logger.info("✅ Content library writer started")
+    except Exception as e:
+        logger.error(f"❌ Content library writer failed to start: {e}")
+    
+    # Start the background risk assessment writer
+    try:
+        from app.services.enhanced_risk_detection import start_assessment_writer
+        start_assessment_writer()
+        logger.info("✅ Risk assessment writer started")
+    except Exception as e:
+        logger.error(f"❌ Risk assessment writer failed to start: {e}")
+    
     yield
     
+    # Flush queued chat logs before the database goes away
+    try:
+        from app.api.v1.chat import stop_chat_log_writer
+        await stop_chat_log_writer()
+    except Exception as e:
+        logger.error(f"❌ Chat log flush failed: {e}")
+    
+    # Flush queued library saves as well
+    try:
+        from app.api.v1.education import stop_library_writer
+        await stop_library_writer()
+    except Exception as e:
+        logger.error(f"❌ Content library flush failed: {e}")
+    
+    # Flush queued risk assessments too
+    try:
+        from app.services.enhanced_risk_detection import stop_assessment_writer
+        await stop_assessment_writer()
+    except Exception as e:
+        logger.error(f"❌ Risk assessment flush failed: {e}")
+    
     # Close MongoDB connection
     try:
         await mongodb.disconnect()
@@ -57,6 +103,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Add opt-in profiling middleware (Server-Timing on every response, X-Profile: 1 for a pyinstrument report)
+if settings.ENABLE_PROFILING:
+    from app.middleware.profiling import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware)
+    logger.info("⏱️ Profiling middleware enabled")
+
 # Add rate limiting middleware
 try:
     from app.api.middleware.rate_limiter import rate_limit_middleware
@@ -116,6 +168,14 @@ async def health_check():
         "version": settings.APP_VERSION
     }
 
+# Malformed ObjectIds in path or query parameters are client errors
+@app.exception_handler(InvalidId)
+async def invalid_id_exception_handler(request: Request, exc: InvalidId):
+    return JSONResponse(
+        status_code=400,
+        content={"detail": f"Invalid id: {exc}"}
+    )
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
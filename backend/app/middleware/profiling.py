@@ -0,0 +1,84 @@
+"""
+⏱️ Profiling Middleware
+Opt-in request profiling and Server-Timing headers for locating per-route hotspots
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import HTMLResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+@contextmanager
+def server_timing(response: Response, name: str) -> Iterator[None]:
+    """Time a block and append it to the response's Server-Timing header"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = f"{name};dur={(time.perf_counter() - start) * 1000:.2f}"
+        existing = response.headers.get("Server-Timing")
+        response.headers["Server-Timing"] = f"{existing}, {entry}" if existing else entry
+
+class ProfilingMiddleware:
+    """
+    ⏱️ Profiling Middleware
+
+    Adds a total Server-Timing entry to every HTTP response. Requests sent with
+    `X-Profile: 1` are run under pyinstrument (when installed) and answered with
+    the HTML profile instead of the route's own response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        if Profiler is None:
+            logger.warning("⚠️ pyinstrument not installed, X-Profile requests will only get Server-Timing")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if Profiler is not None and dict(scope["headers"]).get(PROFILE_HEADER) == b"1":
+            await self._profile(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                entry = f"total;dur={(time.perf_counter() - start) * 1000:.2f}"
+                existing = headers.get("server-timing")
+                headers["Server-Timing"] = f"{existing}, {entry}" if existing else entry
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the request under the profiler and reply with its HTML report"""
+        async def discard(message: Message) -> None:
+            pass
+
+        # Wall clock includes any background work the route awaits on
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        logger.info(f"⏱️ Profiled {scope['method']} {scope['path']}")
+        await HTMLResponse(profiler.output_html())(scope, receive, send)
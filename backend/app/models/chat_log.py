@@ -3,10 +3,12 @@
 Stores chat interactions with comprehensive risk analysis data using MongoDB
 """
 
+import asyncio
 import json
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from bson import ObjectId
+from pymongo import WriteConcern
 from pydantic import BaseModel, Field, validator
 
 class ChatLogDocument(BaseModel):
@@ -15,11 +17,12 @@ class ChatLogDocument(BaseModel):
     """
     
     # Primary fields
-    _id: Optional[str] = Field(None, alias="_id")
     conversation_id: str = Field(..., description="Unique conversation identifier")
     
-    # Message content
-    user_message: str = Field(..., description="Original user message")
+    # Message content (the raw user message is never stored)
+    masked_input: str = Field(..., description="User message with PII masked")
+    message_hash: str = Field(..., description="Hash of the original user message")
+    message_length: int = Field(..., description="Length of the original user message")
     ai_response: str = Field(..., description="AI assistant response")
     user_message_id: str = Field(..., description="Unique user message ID")
     assistant_message_id: str = Field(..., description="Unique assistant message ID")
@@ -56,7 +59,7 @@ class ChatLogDocument(BaseModel):
         schema_extra = {
             "example": {
                 "conversation_id": "48c9e5f5-7a2b-4c8d-9e1f-2a3b4c5d6e7f",
-                "user_message": "My Aadhaar number is 1234-5678-9876",
+                "masked_input": "My Aadhaar number is 12XXXXXXXXXX76",
                 "ai_response": "For your safety, I cannot process Aadhaar numbers...",
                 "user_message_id": "msg_user_123",
                 "assistant_message_id": "msg_ai_456",
@@ -96,13 +99,16 @@ class ChatLogDocument(BaseModel):
         }
     
     @classmethod
-    def from_interaction_data(cls, interaction_data: Dict[str, Any]) -> 'ChatLogDocument':
-        """Create ChatLogDocument from interaction data"""
+    def from_interaction_data(cls, interaction_data: Dict[str, Any], created_at: Optional[str] = None) -> 'ChatLogDocument':
+        """Create ChatLogDocument from interaction data, optionally with a shared creation timestamp"""
         detailed_analysis = interaction_data.get("detailed_risk_analysis", {})
+        audit_fields = {"created_at": created_at, "updated_at": created_at} if created_at else {}
         
         return cls(
             conversation_id=interaction_data["conversation_id"],
-            user_message=interaction_data["user_message"],
+            masked_input=interaction_data["masked_input"],
+            message_hash=interaction_data["message_hash"],
+            message_length=interaction_data["message_length"],
             ai_response=interaction_data["ai_response"],
             user_message_id=interaction_data["user_message_id"],
             assistant_message_id=interaction_data["assistant_message_id"],
@@ -117,7 +123,8 @@ class ChatLogDocument(BaseModel):
             timestamp=interaction_data["timestamp"],
             processing_time_ms=interaction_data.get("processing_time_ms"),
             user_context=interaction_data.get("user_context", {}),
-            session_metadata=interaction_data.get("session_metadata", {})
+            session_metadata=interaction_data.get("session_metadata", {}),
+            **audit_fields
         )
 
 class ChatAnalyticsDocument(BaseModel):
@@ -125,7 +132,6 @@ class ChatAnalyticsDocument(BaseModel):
     Daily chat analytics aggregation document for MongoDB
     """
     
-    _id: Optional[str] = Field(None, alias="_id")
     date: str = Field(..., description="Date in YYYY-MM-DD format")
     
     # Daily statistics
@@ -184,6 +190,9 @@ class ChatAnalyticsDocument(BaseModel):
 class ChatLogRepository:
     """Repository for chat log operations"""
     
+    # Batched chat logs are analytics data: fire-and-forget instead of waiting for acknowledgement
+    BATCH_WRITE_CONCERN = WriteConcern(w=0)
+    
     def __init__(self, database):
         self.database = database
         self.collection_name = "chat_logs"
@@ -203,6 +212,24 @@ class ChatLogRepository:
         except Exception as e:
             raise Exception(f"Failed to save chat interaction: {str(e)}")
     
+    async def save_chat_interactions(self, interactions: List[Dict[str, Any]]) -> List[str]:
+        """Save a batch of chat interactions to database with a single insert"""
+        try:
+            # One clock read stamps the whole batch
+            created_at = datetime.utcnow().isoformat()
+            docs = [
+                ChatLogDocument.from_interaction_data(interaction_data, created_at).to_mongodb_doc()
+                for interaction_data in interactions
+            ]
+            
+            collection = self.database.get_collection(self.collection_name, write_concern=self.BATCH_WRITE_CONCERN)
+            result = await collection.insert_many(docs, ordered=False)
+            
+            return [str(inserted_id) for inserted_id in result.inserted_ids]
+            
+        except Exception as e:
+            raise Exception(f"Failed to save chat interactions: {str(e)}")
+    
     async def get_recent_chats(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent chat interactions"""
         try:
@@ -269,4 +296,94 @@ class ChatLogRepository:
             return result[0]
             
         except Exception as e:
-            raise Exception(f"Failed to get risk statistics: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to get risk statistics: {str(e)}")
+    
+    async def get_dashboard_statistics(self, recent_limit: int = 10) -> Dict[str, Any]:
+        """
+        Get risk overview, level percentages, flag counts and recent chats
+
+        The totals come from one $facet aggregation. Recent chats are read
+        separately, because $facet sub-pipelines cannot use indexes; the
+        created_at index serves that sort and limit directly.
+        """
+        try:
+            collection = self.database[self.collection_name]
+            
+            risk_levels = {
+                "safe": "SAFE",
+                "low_risk": "LOW",
+                "medium_risk": "MEDIUM",
+                "high_risk": "HIGH",
+                "critical_risk": "CRITICAL"
+            }
+            
+            overview_group = {
+                "_id": None,
+                "total_chats": {"$sum": 1},
+                "total_risk_detections": {
+                    "$sum": {"$cond": [{"$gt": ["$risk_score", 0]}, 1, 0]}
+                },
+                "average_risk_score": {"$avg": "$risk_score"},
+                "blocked_messages": {
+                    "$sum": {"$cond": [{"$gte": ["$risk_score", 75]}, 1, 0]}
+                }
+            }
+            distribution = {}
+            for name, level in risk_levels.items():
+                overview_group[f"{name}_count"] = {
+                    "$sum": {"$cond": [{"$eq": ["$risk_level", level]}, 1, 0]}
+                }
+                distribution[name] = {
+                    "count": f"${name}_count",
+                    "percentage": {
+                        "$round": [
+                            {"$multiply": [{"$divide": [f"${name}_count", {"$max": ["$total_chats", 1]}]}, 100]},
+                            1
+                        ]
+                    }
+                }
+            
+            pipeline = [
+                {
+                    "$facet": {
+                        "overview": [
+                            {"$group": overview_group},
+                            {
+                                "$project": {
+                                    "_id": 0,
+                                    "total_chats": 1,
+                                    "total_risk_detections": 1,
+                                    "average_risk_score": 1,
+                                    "blocked_messages": 1,
+                                    "risk_distribution": distribution
+                                }
+                            }
+                        ],
+                        "flag_counts": [
+                            {"$unwind": "$risk_flags"},
+                            {"$group": {"_id": "$risk_flags", "count": {"$sum": 1}}}
+                        ]
+                    }
+                }
+            ]
+            
+            facets, recent = await asyncio.gather(
+                collection.aggregate(pipeline).to_list(1),
+                collection.find().sort("created_at", -1).limit(recent_limit).to_list(recent_limit)
+            )
+            result = facets[0]
+            
+            for doc in recent:
+                doc["_id"] = str(doc["_id"])
+            
+            overview = result["overview"][0] if result["overview"] else {}
+            
+            return {
+                "overview": overview,
+                "risk_distribution": overview.pop("risk_distribution", {}),
+                "flag_counts": {entry["_id"]: entry["count"] for entry in result["flag_counts"]},
+                "recent_activity": recent
+            }
+            
+        except Exception as e:
+            raise Exception(f"Failed to get dashboard statistics: {str(e)}")
@@ -14,9 +14,6 @@ class RiskLogDocument(BaseModel):
     Used for dashboard analytics and compliance tracking
     """
     
-    # Primary fields
-    _id: Optional[str] = Field(None, alias="_id")
-    
     # Request identification
     user_id: Optional[str] = Field(None, description="User ID if available")
     session_id: Optional[str] = Field(None, description="Session ID if available")
@@ -70,7 +67,7 @@ class RiskLogDocument(BaseModel):
             session_id=interaction_data.get("session_metadata", {}).get("session_id"),
             conversation_id=interaction_data["conversation_id"],
             timestamp=interaction_data["timestamp"],
-            masked_input=interaction_data.get("masked_input", interaction_data["user_message"][:100] + "..." if len(interaction_data["user_message"]) > 100 else interaction_data["user_message"]),
+            masked_input=interaction_data["masked_input"][:100] + "..." if len(interaction_data["masked_input"]) > 100 else interaction_data["masked_input"],
             response_length=len(interaction_data["ai_response"]),
             risk_score=interaction_data["risk_score"],
             risk_level=interaction_data["risk_level"],
@@ -100,6 +97,66 @@ class RiskLogRepository:
         except Exception as e:
             raise Exception(f"Failed to save risk log: {str(e)}")
     
+    async def project_chat_logs(self, since: Optional[datetime] = None) -> None:
+        """
+        Derive risk logs from chat logs inserted since the given time with a
+        server-side $merge. Risk logs reuse the chat log _id, so re-projecting
+        an overlapping window never duplicates entries.
+        """
+        try:
+            pipeline = []
+            if since is not None:
+                pipeline.append({"$match": {"_id": {"$gte": ObjectId.from_datetime(since)}}})
+            
+            pipeline.extend([
+                {
+                    "$project": {
+                        "user_id": "$user_context.user_id",
+                        "session_id": "$session_metadata.session_id",
+                        "conversation_id": 1,
+                        "timestamp": 1,
+                        "created_at": {"$ifNull": ["$created_at", "$timestamp"]},
+                        "masked_input": {
+                            "$cond": [
+                                {"$gt": [{"$strLenCP": "$masked_input"}, 100]},
+                                {"$concat": [{"$substrCP": ["$masked_input", 0, 100]}, "..."]},
+                                "$masked_input"
+                            ]
+                        },
+                        "response_length": {"$strLenCP": "$ai_response"},
+                        "risk_score": 1,
+                        "risk_level": 1,
+                        "risk_flags": 1,
+                        "processing_time_ms": 1,
+                        "analysis_version": {"$literal": "3.0"}
+                    }
+                },
+                {
+                    "$merge": {
+                        "into": self.collection_name,
+                        "on": "_id",
+                        "whenMatched": "keepExisting",
+                        "whenNotMatched": "insert"
+                    }
+                }
+            ])
+            
+            await self.database["chat_logs"].aggregate(pipeline).to_list(None)
+            
+        except Exception as e:
+            raise Exception(f"Failed to project chat logs: {str(e)}")
+    
+    async def get_latest_log_time(self) -> Optional[datetime]:
+        """Get the insert time of the newest risk log"""
+        try:
+            collection = self.database[self.collection_name]
+            doc = await collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+            
+            return doc["_id"].generation_time if doc else None
+            
+        except Exception as e:
+            raise Exception(f"Failed to get latest risk log time: {str(e)}")
+    
     async def get_recent_logs(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent risk logs"""
         try:
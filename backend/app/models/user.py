@@ -3,8 +3,8 @@ User model and schemas
 """
 
 from datetime import datetime
-from typing import Optional, List, Any
-from pydantic import BaseModel, EmailStr, Field
+from typing import Optional, List, Any, Annotated
+from pydantic import BaseModel, EmailStr, Field, StringConstraints
 from bson import ObjectId
 
 
@@ -38,6 +38,7 @@ class UserBase(BaseModel):
 
 class UserCreate(UserBase):
     """User creation schema"""
+    full_name: Annotated[str, StringConstraints(strip_whitespace=True, min_length=2)]
     password: str = Field(..., min_length=8)
 
 
@@ -0,0 +1,84 @@
+"""
+🗄️ Educational Content Cache
+Reuses generated educational content for identical generation requests
+"""
+
+import hashlib
+import logging
+from typing import Optional
+
+import orjson
+from cachetools import TTLCache
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.services.educational_content import EducationalContent, ContentType, DifficultyLevel
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+# Request fields that only control side effects, not the generated content
+CACHE_KEY_EXCLUDED_FIELDS = {"save_to_library"}
+
+class EducationalContentCache:
+    """
+    Two-level cache for generated educational content
+
+    Entries live in a per-process TTL cache and, when ENABLE_REDIS_CACHE is set,
+    are shared across workers through Redis under the same key and TTL.
+    """
+
+    def __init__(self):
+        self.ttl_seconds = settings.EDUCATION_CONTENT_CACHE_TTL_SECONDS
+        self._local: TTLCache = TTLCache(maxsize=settings.EDUCATION_CONTENT_CACHE_SIZE, ttl=self.ttl_seconds)
+        self._redis = None
+        if settings.ENABLE_REDIS_CACHE and settings.REDIS_URL and redis_asyncio is not None:
+            self._redis = redis_asyncio.from_url(settings.REDIS_URL)
+
+    @staticmethod
+    def make_key(endpoint: str, request: BaseModel) -> str:
+        """Hash the endpoint and its content-relevant request fields into a cache key"""
+        payload = orjson.dumps(
+            request.model_dump(exclude=CACHE_KEY_EXCLUDED_FIELDS),
+            option=orjson.OPT_SORT_KEYS
+        )
+        return hashlib.sha256(endpoint.encode() + b":" + payload).hexdigest()
+
+    async def get(self, key: str) -> Optional[EducationalContent]:
+        """Return cached content for key, or None on a miss"""
+        content = self._local.get(key)
+        if content is not None or self._redis is None:
+            return content
+
+        try:
+            raw = await self._redis.get(f"edu:content:{key}")
+        except Exception as e:
+            logger.warning(f"⚠️ Redis content cache read failed: {e}")
+            return None
+        if raw is None:
+            return None
+
+        data = orjson.loads(raw)
+        data["content_type"] = ContentType(data["content_type"])
+        data["difficulty_level"] = DifficultyLevel(data["difficulty_level"])
+        content = EducationalContent(**data)
+        self._local[key] = content
+        return content
+
+    async def set(self, key: str, content: EducationalContent) -> None:
+        """Store generated content under key"""
+        self._local[key] = content
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.set(f"edu:content:{key}", orjson.dumps(content), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis content cache write failed: {e}")
+
+# Global cache instance
+educational_content_cache = EducationalContentCache()
@@ -29,6 +29,13 @@ class DifficultyLevel(Enum):
     BEGINNER = "beginner"
     INTERMEDIATE = "intermediate"
     ADVANCED = "advanced"
+    
+    @classmethod
+    def _missing_(cls, value):
+        # Accept any casing, e.g. "Beginner"
+        if isinstance(value, str):
+            return cls._value2member_map_.get(value.lower())
+        return None
 
 @dataclass
 class EducationalContent:
@@ -665,9 +672,9 @@ educational_content_service = EducationalContentGenerator()
 # Convenience functions
 async def generate_misinformation_explanation(topic: str, 
                                             detected_issues: List[str],
-                                            difficulty_level: str = "intermediate") -> EducationalContent:
+                                            difficulty_level: Union[str, DifficultyLevel] = "intermediate") -> EducationalContent:
     """Generate educational explanation about misinformation"""
-    level = DifficultyLevel(difficulty_level.lower())
+    level = DifficultyLevel(difficulty_level)
     return await educational_content_service.generate_misinformation_explanation(
         topic=topic,
         detected_issues=detected_issues,
@@ -675,9 +682,9 @@ async def generate_misinformation_explanation(topic: str,
     )
 
 async def generate_fact_checking_guide(content_category: str,
-                                     difficulty_level: str = "intermediate") -> EducationalContent:
+                                     difficulty_level: Union[str, DifficultyLevel] = "intermediate") -> EducationalContent:
     """Generate fact-checking guide for specific category"""
-    level = DifficultyLevel(difficulty_level.lower())
+    level = DifficultyLevel(difficulty_level)
     return await educational_content_service.generate_fact_checking_guide(
         content_category=content_category,
         difficulty_level=level
@@ -685,9 +692,9 @@ async def generate_fact_checking_guide(content_category: str,
 
 async def generate_bias_awareness_content(bias_types: List[str],
                                         cultural_context: str = "indian",
-                                        difficulty_level: str = "intermediate") -> EducationalContent:
+                                        difficulty_level: Union[str, DifficultyLevel] = "intermediate") -> EducationalContent:
     """Generate bias awareness content"""
-    level = DifficultyLevel(difficulty_level.lower())
+    level = DifficultyLevel(difficulty_level)
     return await educational_content_service.generate_bias_awareness_content(
         bias_types=bias_types,
         cultural_context=cultural_context,
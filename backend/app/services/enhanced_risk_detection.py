@@ -63,6 +63,10 @@ from app.core.database import get_database_operations
 
 logger = logging.getLogger(__name__)
 
+# Assessments from concurrent requests are saved in batches by a single background task
+_assessment_queue: Optional[asyncio.Queue] = None
+_assessment_writer: Optional[asyncio.Task] = None
+
 class EnhancedRiskDetectionService:
     """
     🛡️ Enhanced Risk Detection Service
@@ -479,10 +483,8 @@ class EnhancedRiskDetectionService:
         return list(set(actions))  # Remove duplicates
     
     async def _save_risk_assessment(self, result: EnhancedRiskResult, content: str, user_id: Optional[str]):
-        """Save risk assessment to database"""
+        """Hand the risk assessment to the background assessment writer"""
         try:
-            db_ops = await get_database_operations()
-            
             assessment_data = {
                 'user_id': user_id,
                 'content_hash': hash(content),
@@ -497,11 +499,76 @@ class EnhancedRiskDetectionService:
                 'created_at': datetime.utcnow()
             }
             
-            await db_ops.db.enhanced_risk_assessments.insert_one(assessment_data)
+            queue = start_assessment_writer()
+            if queue.full():
+                dropped = queue.get_nowait()
+                if dropped is None:
+                    # The writer is stopping; keep its shutdown sentinel and drop the new assessment instead
+                    queue.put_nowait(None)
+                    logger.warning(f"⚠️ Risk assessment writer is stopping, dropped assessment for user {user_id}")
+                    return
+                logger.warning(f"⚠️ Risk assessment queue full, dropped assessment for user {dropped['user_id']}")
+            queue.put_nowait(assessment_data)
             
         except Exception as e:
             logger.error(f"❌ Failed to save risk assessment: {e}")
 
+async def _write_assessment_batch(batch: List[Dict[str, Any]]) -> None:
+    """Save a batch of risk assessments with a single insert"""
+    try:
+        db_ops = await get_database_operations()
+        await db_ops.db.enhanced_risk_assessments.insert_many(batch, ordered=False)
+        logger.info(f"💾 Saved {len(batch)} risk assessments")
+        
+    except Exception as e:
+        logger.error(f"❌ Failed to save {len(batch)} risk assessments: {e}")
+
+async def _run_assessment_writer(queue: asyncio.Queue) -> None:
+    """Drain the assessment queue in batches until the None sentinel arrives"""
+    batch_size = settings.RISK_ASSESSMENT_BATCH_SIZE
+    flush_interval = settings.RISK_ASSESSMENT_FLUSH_INTERVAL_MS / 1000
+    
+    while True:
+        assessment_data = await queue.get()
+        if assessment_data is None:
+            return
+        batch = [assessment_data]
+        
+        # Give a partial batch a moment to fill before writing it
+        if queue.qsize() < batch_size - 1:
+            await asyncio.sleep(flush_interval)
+        
+        closing = False
+        while len(batch) < batch_size and not queue.empty():
+            assessment_data = queue.get_nowait()
+            if assessment_data is None:
+                closing = True
+                break
+            batch.append(assessment_data)
+        
+        await _write_assessment_batch(batch)
+        if closing:
+            return
+
+def start_assessment_writer() -> asyncio.Queue:
+    """Start the background risk assessment writer if it is not running"""
+    global _assessment_queue, _assessment_writer
+    if _assessment_writer is None or _assessment_writer.done():
+        _assessment_queue = asyncio.Queue(maxsize=settings.TASK_QUEUE_SIZE)
+        _assessment_writer = asyncio.create_task(_run_assessment_writer(_assessment_queue))
+    return _assessment_queue
+
+async def stop_assessment_writer() -> None:
+    """Flush queued risk assessments and stop the background writer"""
+    global _assessment_queue, _assessment_writer
+    if _assessment_writer is None:
+        return
+    if not _assessment_writer.done():
+        await _assessment_queue.put(None)
+        await _assessment_writer
+    _assessment_queue = None
+    _assessment_writer = None
+
 # Global service instance
 enhanced_risk_service = EnhancedRiskDetectionService()
 
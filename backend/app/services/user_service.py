@@ -3,12 +3,15 @@
 User service for MongoDB operations
 """
 
+import asyncio
 import logging
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from bson import ObjectId
+from cachetools import TTLCache
 from pymongo.errors import DuplicateKeyError
 
+from app.core.config import settings
 from app.core.database import mongodb
 from app.core.auth import get_password_hash, verify_password
 from app.models.user import UserCreate, UserUpdate, UserInDB, UserResponse
@@ -18,6 +21,25 @@ logger = logging.getLogger(__name__)
 # In-memory storage for development mode
 _dev_users = {}
 _dev_user_counter = 1
+# email -> user id, the in-memory counterpart of the unique users.email index
+_dev_users_by_email = {}
+
+# Short-lived user snapshots for hot read paths such as token refresh.
+# The cache is per process: invalidation only reaches the worker that did the
+# write, so other workers may serve a stale user for up to the TTL.
+_user_cache: TTLCache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+# Bumped on every invalidation so a lookup that raced a write doesn't re-cache the old user
+_user_cache_generation = 0
+
+
+def _invalidate_cached_user(user_id: str) -> None:
+    """Drop a user's cached snapshot after a successful write"""
+    global _user_cache_generation
+    _user_cache_generation += 1
+    _user_cache.pop(user_id, None)
 
 
 class UserService:
@@ -42,7 +64,7 @@ class UserService:
             
             # Production mode - use MongoDB
             # Hash the password
-            password_hash = get_password_hash(user_data.password)
+            password_hash = await asyncio.to_thread(get_password_hash, user_data.password)
             
             # Prepare user document
             user_doc = {
@@ -74,18 +96,58 @@ class UserService:
             logger.error(f"❌ Failed to create user: {e}")
             return None
     
+    async def create_if_absent(self, user_data: UserCreate) -> Tuple[Optional[UserInDB], bool]:
+        """
+        Create a new user unless the email is already registered
+        
+        Relies on the unique email index instead of a separate lookup, so the
+        happy path is a single insert. Returns (user, created); created is
+        False when the email already exists.
+        """
+        # Development mode - the in-memory store does its own duplicate check
+        if not mongodb.connected:
+            user = await self._create_dev_user(user_data)
+            return user, user is not None
+        
+        password_hash = await asyncio.to_thread(get_password_hash, user_data.password)
+        now = datetime.utcnow()
+        user_doc = {
+            "email": user_data.email,
+            "full_name": user_data.full_name,
+            "role": user_data.role,
+            "is_active": user_data.is_active,
+            "password_hash": password_hash,
+            "created_at": now,
+            "updated_at": now,
+            "last_login": None
+        }
+        
+        try:
+            # insert_one fills in user_doc["_id"], so no read-back is needed
+            await self.collection.insert_one(user_doc)
+        except DuplicateKeyError:
+            logger.warning(f"⚠️ User with email {user_data.email} already exists")
+            return None, False
+        
+        logger.info(f"✅ User created successfully: {user_data.email}")
+        return UserInDB(**user_doc), True
+    
     async def _create_dev_user(self, user_data: UserCreate) -> Optional[UserInDB]:
         """Create user in development mode (in-memory)"""
         global _dev_user_counter
         
         # Check if user already exists
-        for user in _dev_users.values():
-            if user.email == user_data.email:
-                logger.warning(f"⚠️ User with email {user_data.email} already exists (dev mode)")
-                return None
+        if user_data.email in _dev_users_by_email:
+            logger.warning(f"⚠️ User with email {user_data.email} already exists (dev mode)")
+            return None
         
         # Hash the password
-        password_hash = get_password_hash(user_data.password)
+        password_hash = await asyncio.to_thread(get_password_hash, user_data.password)
+        
+        # Re-check: another registration may have claimed the email while hashing
+        if user_data.email in _dev_users_by_email:
+            logger.warning(f"⚠️ User with email {user_data.email} already exists (dev mode)")
+            return None
         
         # Create user
         user_id = ObjectId()
@@ -102,6 +164,7 @@ class UserService:
         )
         
         _dev_users[str(user_id)] = user
+        _dev_users_by_email[user.email] = str(user_id)
         _dev_user_counter += 1
         
         logger.info(f"✅ User created successfully (dev mode): {user_data.email}")
@@ -127,17 +190,25 @@ class UserService:
             logger.error(f"❌ Failed to get user by ID: {e}")
             return None
     
+    async def get_by_id_cached(self, user_id: str) -> Optional[UserInDB]:
+        """Get user by ID, serving repeat lookups within the cache TTL from memory"""
+        user = _user_cache.get(user_id)
+        if user is None:
+            generation = _user_cache_generation
+            user = await self.get_by_id(user_id)
+            if user is not None and generation == _user_cache_generation:
+                _user_cache[user_id] = user
+        return user
+    
     async def get_by_email(self, email: str) -> Optional[UserInDB]:
         """Get user by email"""
         try:
             # Development mode
             if not mongodb.connected:
-                for user in _dev_users.values():
-                    if user.email == email:
-                        return user
-                return None
+                user_id = _dev_users_by_email.get(email)
+                return _dev_users.get(user_id) if user_id else None
             
-            # Production mode
+            # Production mode (served by the unique users.email index)
             user_doc = await self.collection.find_one({"email": email})
             if user_doc:
                 return UserInDB(**user_doc)
@@ -159,6 +230,7 @@ class UserService:
                         if value is not None:
                             setattr(user, field, value)
                     user.updated_at = datetime.utcnow()
+                    _invalidate_cached_user(user_id)
                     return user
                 return None
             
@@ -181,6 +253,7 @@ class UserService:
                 {"_id": ObjectId(user_id)},
                 {"$set": update_data}
             )
+            _invalidate_cached_user(user_id)
             
             if result.modified_count > 0:
                 # Return updated user
@@ -198,7 +271,9 @@ class UserService:
             # Development mode
             if not mongodb.connected:
                 if user_id in _dev_users:
-                    del _dev_users[user_id]
+                    user = _dev_users.pop(user_id)
+                    _dev_users_by_email.pop(user.email, None)
+                    _invalidate_cached_user(user_id)
                     return True
                 return False
             
@@ -207,6 +282,7 @@ class UserService:
                 return False
             
             result = await self.collection.delete_one({"_id": ObjectId(user_id)})
+            _invalidate_cached_user(user_id)
             return result.deleted_count > 0
             
         except Exception as e:
@@ -225,7 +301,8 @@ class UserService:
             
             logger.info(f"🔍 User found: {email}, checking password...")
             
-            if not verify_password(password, user.password_hash):
+            # bcrypt is deliberately slow; run it in a worker thread so other requests keep flowing
+            if not await asyncio.to_thread(verify_password, password, user.password_hash):
                 logger.warning(f"⚠️ Password verification failed for user: {email}")
                 return None
             
@@ -240,6 +317,7 @@ class UserService:
             else:
                 # Development mode
                 user.last_login = datetime.utcnow()
+            _invalidate_cached_user(str(user.id))
             
             logger.info(f"✅ User authenticated successfully: {email}")
             return user
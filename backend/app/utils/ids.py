@@ -0,0 +1,46 @@
+"""
+🆔 Identifier Generation Module
+Provides time-ordered UUIDv7 identifiers for conversations and messages
+"""
+
+import os
+import time
+import uuid
+from typing import Iterator
+
+try:
+    import uuid_utils
+except ImportError:
+    uuid_utils = None
+
+# Random bytes consumed per UUIDv7 (12-bit rand_a + 62-bit rand_b, rounded up)
+UUID7_RANDOM_BYTES = 10
+# Number of ids drawn from a single os.urandom call
+UUID7_BATCH_SIZE = 64
+
+_RAND_A_MASK = 0xFFF
+_RAND_B_MASK = (1 << 62) - 1
+
+def _uuid7_batch() -> Iterator[str]:
+    """Yield UUIDv7 strings, refilling the random pool once per UUID7_BATCH_SIZE ids"""
+    while True:
+        pool = os.urandom(UUID7_RANDOM_BYTES * UUID7_BATCH_SIZE)
+        for offset in range(0, len(pool), UUID7_RANDOM_BYTES):
+            rand = int.from_bytes(pool[offset:offset + UUID7_RANDOM_BYTES], "big")
+            unix_ms = time.time_ns() // 1_000_000
+            value = (
+                (unix_ms & 0xFFFF_FFFF_FFFF) << 80
+                | 0x7 << 76
+                | ((rand >> 62) & _RAND_A_MASK) << 64
+                | 0b10 << 62
+                | (rand & _RAND_B_MASK)
+            )
+            yield str(uuid.UUID(int=value))
+
+_uuid7_pool = _uuid7_batch()
+
+def next_id() -> str:
+    """Return a new UUIDv7 string; ids sort by creation time, which keeps index inserts local"""
+    if uuid_utils is not None:
+        return str(uuid_utils.uuid7())
+    return next(_uuid7_pool)
@@ -11,6 +11,13 @@ from cryptography.fernet import Fernet
 import os
 import base64
 
+from app.core.config import settings
+
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
 logger = logging.getLogger(__name__)
 
 class PIITokenizer:
@@ -20,6 +27,7 @@ class PIITokenizer:
         # Generate or load encryption key
         self.fernet_key = self._get_or_generate_key()
         self.fernet = Fernet(self.fernet_key)
+        self._hash = self._get_hash_function(settings.PII_HASH_ALGORITHM)
         
     def _get_or_generate_key(self) -> bytes:
         """Get encryption key from environment or generate new one"""
@@ -41,6 +49,20 @@ class PIITokenizer:
         )
         return key
     
+    @staticmethod
+    def _get_hash_function(algorithm: str):
+        """Resolve PII_HASH_ALGORITHM to a hash constructor, defaulting to SHA-256"""
+        algorithm = algorithm.lower()
+        if algorithm == "blake3":
+            if blake3 is not None:
+                return blake3
+            logger.warning("blake3 package not installed, falling back to sha256 for PII hashing")
+        elif algorithm in hashlib.algorithms_guaranteed and not algorithm.startswith("shake_"):
+            return getattr(hashlib, algorithm)
+        else:
+            logger.warning(f"Unsupported PII hash algorithm {algorithm!r}, falling back to sha256")
+        return hashlib.sha256
+    
     def hash_pii(self, value: str, include_salt: bool = True) -> str:
         """
         Generate a one-way hash token for sensitive info
@@ -62,9 +84,8 @@ class PIITokenizer:
         else:
             salted_value = value
             
-        # Create SHA-256 hash
-        hash_object = hashlib.sha256(salted_value.encode())
-        return hash_object.hexdigest()
+        # Hash with the configured algorithm (SHA-256 unless PII_HASH_ALGORITHM says otherwise)
+        return self._hash(salted_value.encode()).hexdigest()
     
     def encrypt_pii(self, value: str) -> str:
         """
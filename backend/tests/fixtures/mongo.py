@@ -0,0 +1,144 @@
+"""
+In-memory stand-in for the motor collection calls the API handlers make
+
+Supports the query operators ($and, $or, $lt, equality) and update pipeline
+expressions the handlers actually use, with MongoDB's semantics for missing
+fields, so paging and pipeline updates can be checked without a server.
+"""
+
+from typing import Any, Dict, List
+
+MISSING = object()
+
+def _get_path(value: Any, path: str) -> Any:
+    """Resolve a dotted path, collecting values across arrays like MongoDB does"""
+    for part in path.split("."):
+        if isinstance(value, list):
+            value = [item[part] for item in value if isinstance(item, dict) and part in item]
+        elif isinstance(value, dict):
+            value = value.get(part, MISSING)
+        else:
+            return MISSING
+    return value
+
+def _set_path(doc: Dict[str, Any], path: str, value: Any) -> None:
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = value
+
+def matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Evaluate a find() filter against a document"""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(doc, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict) and all(op.startswith("$") for op in condition):
+            value = _get_path(doc, key)
+            for op, operand in condition.items():
+                if op == "$lt":
+                    if value is MISSING or not value < operand:
+                        return False
+                else:
+                    raise NotImplementedError(op)
+        elif _get_path(doc, key) != condition:
+            return False
+    return True
+
+def evaluate(expression: Any, doc: Dict[str, Any], variables: Dict[str, Any] = None) -> Any:
+    """Evaluate an aggregation expression against a document"""
+    variables = variables or {}
+    if isinstance(expression, str) and expression.startswith("$$"):
+        name, _, path = expression[2:].partition(".")
+        return _get_path(variables[name], path) if path else variables[name]
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get_path(doc, expression[1:])
+    if isinstance(expression, list):
+        return [evaluate(item, doc, variables) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+    if len(expression) != 1 or not next(iter(expression)).startswith("$"):
+        return {key: evaluate(value, doc, variables) for key, value in expression.items()}
+
+    (op, args), = expression.items()
+    if op == "$map":
+        items = evaluate(args["input"], doc, variables)
+        return [evaluate(args["in"], doc, {**variables, "this": item}) for item in items]
+    values = evaluate(args, doc, variables)
+    if op == "$ifNull":
+        return next((value for value in values[:-1] if value not in (None, MISSING)), values[-1])
+    if op == "$arrayToObject":
+        return {pair["k"]: pair["v"] for pair in values}
+    if op == "$sum":
+        items = values if isinstance(values, list) else [values]
+        return sum(item for item in items if isinstance(item, (int, float)))
+    if op == "$size":
+        return len(values)
+    if op == "$add":
+        return sum(values)
+    if op == "$subtract":
+        return values[0] - values[1]
+    if op == "$divide":
+        return values[0] / values[1]
+    if op == "$round":
+        return round(values[0], values[1])
+    if op == "$eq":
+        return values[0] == values[1]
+    if op == "$cond":
+        return values[1] if values[0] else values[2]
+    raise NotImplementedError(op)
+
+def apply_update_pipeline(doc: Dict[str, Any], pipeline: List[Dict[str, Any]]) -> None:
+    """Apply $set/$unset pipeline stages to a document in place"""
+    for stage in pipeline:
+        (op, spec), = stage.items()
+        if op == "$set":
+            values = {path: evaluate(expression, doc) for path, expression in spec.items()}
+            for path, value in values.items():
+                _set_path(doc, path, value)
+        elif op == "$unset":
+            for path in [spec] if isinstance(spec, str) else spec:
+                doc.pop(path, None)
+        else:
+            raise NotImplementedError(op)
+
+class FakeCursor:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+
+    def sort(self, keys, direction=None):
+        if isinstance(keys, str):
+            keys = [(keys, direction)]
+        for key, key_direction in reversed(keys):
+            self.docs.sort(key=lambda doc: doc[key], reverse=key_direction < 0)
+        return self
+
+    def skip(self, count: int):
+        self.docs = self.docs[count:]
+        return self
+
+    def limit(self, count: int):
+        self.docs = self.docs[:count]
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[:length]
+
+class FakeCollection:
+    def __init__(self, docs: List[Dict[str, Any]] = None):
+        self.docs = docs or []
+
+    def find(self, query: Dict[str, Any] = None, projection: Dict[str, Any] = None) -> FakeCursor:
+        return FakeCursor([dict(doc) for doc in self.docs if matches(doc, query or {})])
+
+    async def find_one_and_update(self, query, pipeline, projection=None, return_document=None):
+        doc = next((doc for doc in self.docs if matches(doc, query)), None)
+        if doc is not None:
+            apply_update_pipeline(doc, pipeline)
+        return doc
@@ -0,0 +1,46 @@
+"""
+Critical chat input: the blocking template is safe to return without output analysis
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import chat
+from app.core.config import settings
+
+CRITICAL_MESSAGE = "email me at a@b.com, ssn 123-45-6789, call 555-123-4567"
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(chat, "start_chat_log_writer", lambda: asyncio.Queue())
+
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/chat")
+    return TestClient(app)
+
+def test_critical_response_carries_no_risk():
+    risk_analysis = chat.risk_analyzer.analyze_content_for_dashboard(CRITICAL_MESSAGE)
+    assert risk_analysis["risk_score"] >= 75
+
+    response = chat._critical_response(risk_analysis)
+    output = chat.risk_analyzer.analyze_content_for_dashboard(response, {"content_length": len(response)})
+
+    assert output["risk_score"] == 0
+    assert output["risk_flags"] == ["None"]
+
+def test_skipping_output_analysis_does_not_change_the_realtime_result(client, monkeypatch):
+    # A client-chosen conversation id used to be echoed into the template, where
+    # "12345678" was picked up as PII by the output analysis
+    request = {"message": CRITICAL_MESSAGE, "conversation_id": "12345678-conv"}
+
+    monkeypatch.setattr(settings, "SKIP_LLM_ON_CRITICAL", True)
+    skipped = client.post("/chat/realtime", json=request).json()
+    monkeypatch.setattr(settings, "SKIP_LLM_ON_CRITICAL", False)
+    analyzed = client.post("/chat/realtime", json=request).json()
+
+    skipped.pop("timestamp")
+    analyzed.pop("timestamp")
+    assert skipped == analyzed
@@ -0,0 +1,155 @@
+"""
+Chat log write path: queued safe entries must become chat_logs and risk_logs documents
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.api.v1 import chat
+from app.models.chat_log import ChatLogRepository
+from app.models.risk_log import RiskLogRepository
+
+RAW_EMAIL = "priya.sharma@example.com"
+
+class FakeCollection:
+    def __init__(self):
+        self.inserted = []
+        self.pipelines = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.inserted.extend(docs)
+        return SimpleNamespace(inserted_ids=list(range(len(docs))))
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return SimpleNamespace(to_list=self._empty_list)
+
+    async def _empty_list(self, length=None):
+        return []
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+    def get_collection(self, name, write_concern=None):
+        return self[name]
+
+def _interaction(message: str):
+    return {
+        "conversation_id": "conv-1",
+        "user_message": message,
+        "ai_response": "I can't store personal contact details.",
+        "risk_score": 40,
+        "risk_level": "MEDIUM",
+        "risk_flags": ["PII Detected"],
+        "timestamp": "2025-09-26T15:30:00",
+        "user_message_id": "m1",
+        "assistant_message_id": "m2",
+        "ip_hash": "abc",
+        "detailed_risk_analysis": {"input_risks": {}, "output_risks": {}, "confidence": 0.9}
+    }
+
+def _queued_entry(monkeypatch, message: str):
+    """Run log_chat_interaction and return the entry it hands to the background writer"""
+    async def run():
+        queue = asyncio.Queue()
+        monkeypatch.setattr(chat, "start_chat_log_writer", lambda: queue)
+        await chat.log_chat_interaction(_interaction(message))
+        return queue.get_nowait()
+    return asyncio.run(run())
+
+def test_queued_entry_is_saved_to_chat_logs_without_raw_pii(monkeypatch):
+    entry = _queued_entry(monkeypatch, f"My email is {RAW_EMAIL}, please remember it")
+    database = FakeDatabase()
+
+    asyncio.run(ChatLogRepository(database).save_chat_interactions([entry]))
+
+    (doc,) = database["chat_logs"].inserted
+    assert doc["conversation_id"] == "conv-1"
+    assert doc["message_hash"] == entry["message_hash"]
+    assert "please remember it" in doc["masked_input"]
+    assert RAW_EMAIL not in str(doc)
+
+def _field_paths(expression):
+    """Yield the document field paths ("$field.sub") referenced by an aggregation expression"""
+    if isinstance(expression, str):
+        if expression.startswith("$") and not expression.startswith("$$"):
+            yield expression[1:]
+    elif isinstance(expression, dict):
+        for value in expression.values():
+            yield from _field_paths(value)
+    elif isinstance(expression, list):
+        for value in expression:
+            yield from _field_paths(value)
+
+def test_risk_log_projection_only_reads_fields_chat_logs_store(monkeypatch):
+    entry = _queued_entry(monkeypatch, f"Contact me at {RAW_EMAIL}")
+    database = FakeDatabase()
+    asyncio.run(ChatLogRepository(database).save_chat_interactions([entry]))
+    asyncio.run(RiskLogRepository(database).project_chat_logs())
+
+    (doc,) = database["chat_logs"].inserted
+    (pipeline,) = database["chat_logs"].pipelines
+    projection = next(stage["$project"] for stage in pipeline if "$project" in stage)
+    
+    read_fields = {path.split(".")[0] for path in _field_paths(projection)}
+    read_fields |= {field for field, value in projection.items() if value == 1}
+    assert "masked_input" in read_fields
+    assert read_fields <= set(doc)
+
+def test_full_queue_keeps_the_shutdown_sentinel(monkeypatch):
+    async def run():
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait(None)
+        monkeypatch.setattr(chat, "start_chat_log_writer", lambda: queue)
+        await chat.log_chat_interaction(_interaction("Hello"))
+        
+        assert queue.qsize() == 1
+        # The writer still sees the sentinel and returns instead of waiting forever
+        await asyncio.wait_for(chat._run_chat_log_writer(queue), timeout=1)
+    asyncio.run(run())
+
+def test_stop_waits_for_the_projector_before_the_final_projection(monkeypatch):
+    events = []
+    
+    async def projector():
+        try:
+            await asyncio.Event().wait()
+        finally:
+            events.append("projector stopped")
+    
+    async def project_risk_logs(since):
+        events.append("final projection")
+    
+    async def run():
+        monkeypatch.setattr(chat, "_project_risk_logs", project_risk_logs)
+        finished_writer = asyncio.create_task(asyncio.sleep(0))
+        await finished_writer
+        monkeypatch.setattr(chat, "_chat_log_writer", finished_writer)
+        monkeypatch.setattr(chat, "_risk_log_projector", asyncio.create_task(projector()))
+        await asyncio.sleep(0)
+        
+        await chat.stop_chat_log_writer()
+    asyncio.run(run())
+    
+    assert events == ["projector stopped", "final projection"]
+
+def test_dashboard_recent_activity_is_an_indexed_find_not_a_facet():
+    from tests.fixtures.mongo import FakeCollection
+    
+    class ChatLogs(FakeCollection):
+        def aggregate(self, pipeline):
+            self.pipeline = pipeline
+            return SimpleNamespace(to_list=self._facets)
+        
+        async def _facets(self, length=None):
+            return [{"overview": [], "flag_counts": [{"_id": "Bias", "count": 2}]}]
+    
+    chat_logs = ChatLogs([{"_id": i, "created_at": f"2025-09-26T15:3{i}:00"} for i in range(5)])
+    stats = asyncio.run(ChatLogRepository({"chat_logs": chat_logs}).get_dashboard_statistics(recent_limit=2))
+    
+    (facet_stage,) = chat_logs.pipeline
+    assert set(facet_stage["$facet"]) == {"overview", "flag_counts"}
+    assert [doc["_id"] for doc in stats["recent_activity"]] == ["4", "3"]
+    assert stats["flag_counts"] == {"Bias": 2}
@@ -0,0 +1,72 @@
+"""
+Realtime chat streaming: /chat/realtime?stream=true Server-Sent Events framing
+"""
+
+import asyncio
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import chat
+
+AI_RESPONSE = "Here is a first paragraph.\n\nA second one, with \"quotes\".\n\nAnd a last line\nwith a break."
+
+@pytest.fixture
+def client(monkeypatch):
+    async def generate_risk_aware_response(**kwargs):
+        return AI_RESPONSE
+    monkeypatch.setattr(chat, "generate_risk_aware_response", generate_risk_aware_response)
+    monkeypatch.setattr(chat, "start_chat_log_writer", lambda: asyncio.Queue())
+
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/chat")
+    return TestClient(app)
+
+def _events(body: bytes):
+    """Split an SSE body into (event, data) pairs, checking each frame's layout"""
+    assert body.endswith(b"\n\n")
+    events = []
+    for frame in body[:-2].split(b"\n\n"):
+        event_line, data_line = frame.split(b"\n")
+        assert event_line.startswith(b"event: ") and data_line.startswith(b"data: ")
+        events.append((event_line[len(b"event: "):].decode(), orjson.loads(data_line[len(b"data: "):])))
+    return events
+
+def test_stream_sends_the_message_as_tokens_then_a_final_event(client):
+    response = client.post("/chat/realtime?stream=true", json={"message": "How do I spot fake news?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+
+    events = _events(response.content)
+    names = [name for name, _ in events]
+    assert names == ["token"] * 3 + ["final"]
+    assert "".join(data for name, data in events if name == "token") == AI_RESPONSE
+
+    final = events[-1][1]
+    assert set(final) == {"risk_score", "risk_flags", "conversation_id", "timestamp"}
+
+def test_stream_final_event_matches_the_non_streaming_response(client):
+    request = {"message": "How do I spot fake news?", "conversation_id": "conv-1"}
+    plain = client.post("/chat/realtime", json=request).json()
+    final = _events(client.post("/chat/realtime?stream=true", json=request).content)[-1][1]
+
+    assert plain.pop("message") == AI_RESPONSE
+    plain.pop("timestamp")
+    final.pop("timestamp")
+    assert final == plain
+
+def test_stream_reports_late_failures_as_an_error_event(client, monkeypatch):
+    async def log_chat_interaction(interaction_data):
+        raise RuntimeError("log queue unavailable")
+    monkeypatch.setattr(chat, "log_chat_interaction", log_chat_interaction)
+
+    response = client.post("/chat/realtime?stream=true", json={"message": "How do I spot fake news?"})
+
+    assert response.status_code == 200
+    name, data = _events(response.content)[-1]
+    assert name == "error"
+    assert "log queue unavailable" in data["detail"]
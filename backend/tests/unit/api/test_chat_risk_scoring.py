@@ -0,0 +1,27 @@
+"""
+Chat risk scoring: scoring keywords are looked up in the whole message, not only in the matched spans
+"""
+
+from app.api.v1.chat import risk_analyzer
+
+def test_keyword_outside_the_match_picks_the_heavier_bias_bucket():
+    # findall only returns the captured "retire", so "should retire" was never seen
+    # when keywords were searched in the joined matches (stereotyping, 55)
+    result = risk_analyzer.analyze_content_for_dashboard("old people should retire")
+
+    assert result["risk_score"] == 70
+    assert result["risk_level"] == "HIGH"
+    assert result["risk_flags"] == ["Bias"]
+
+def test_long_content_multiplier_lifts_the_bias_score_to_critical():
+    # Was 60 / HIGH when keywords were searched in the joined matches
+    result = risk_analyzer.analyze_content_for_dashboard("old people should retire", {"content_length": 1500})
+
+    assert result["risk_score"] == 77
+    assert result["risk_level"] == "CRITICAL"
+
+def test_bias_without_a_scoring_keyword_keeps_the_stereotyping_score():
+    result = risk_analyzer.analyze_content_for_dashboard("old people should go away")
+
+    assert result["risk_score"] == 55
+    assert result["risk_level"] == "HIGH"
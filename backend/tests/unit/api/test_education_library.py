@@ -0,0 +1,153 @@
+"""
+Education library: keyset paging and the per-user rating pipeline
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.api.v1 import education
+from tests.fixtures.mongo import FakeCollection
+
+CREATED = datetime(2025, 9, 26, 15, 30)
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FakeCollection()
+    db_ops = SimpleNamespace(db=SimpleNamespace(educational_content=collection))
+
+    async def get_database_operations():
+        return db_ops
+    monkeypatch.setattr(education, "get_database_operations", get_database_operations)
+    return collection
+
+def _user():
+    return SimpleNamespace(id=ObjectId())
+
+def _library_doc(title: str, created_at: datetime, **fields):
+    return {
+        "_id": ObjectId(),
+        "user_id": "someone-else",
+        "is_public": True,
+        "title": title,
+        "content_type": "guide",
+        "difficulty_level": "beginner",
+        "topic": "misinformation",
+        "created_at": created_at,
+        **fields
+    }
+
+def _library_page(user, **params):
+    request = education.ContentLibraryRequest(limit=2, **params)
+    response = asyncio.run(education.get_content_library(request, user))
+    return orjson.loads(response.body)
+
+def test_library_keyset_pages_through_items_sharing_a_timestamp(collection):
+    # Four items share created_at, so the page boundaries fall inside the tie
+    collection.docs = [_library_doc(f"item {i}", CREATED) for i in range(4)]
+    collection.docs.append(_library_doc("newest", CREATED + timedelta(minutes=1)))
+    user = _user()
+
+    titles, params = [], {}
+    while page := _library_page(user, **params):
+        titles += [item["title"] for item in page]
+        last = page[-1]
+        params = {"before": datetime.fromisoformat(last["created_at"]), "after_id": last["content_id"]}
+
+    assert titles == ["newest", "item 3", "item 2", "item 1", "item 0"]
+
+def test_library_rejects_a_malformed_after_id(collection):
+    with pytest.raises(HTTPException) as error:
+        _library_page(_user(), before=CREATED, after_id="not-an-id")
+    assert error.value.status_code == 400
+
+def _rate(user, content_id, rating: float) -> float:
+    response = asyncio.run(education.rate_content(str(content_id), rating, user))
+    return response["average_rating"]
+
+def test_first_rating_starts_the_running_average(collection):
+    doc = _library_doc("guide", CREATED)
+    collection.docs = [doc]
+
+    assert _rate(_user(), doc["_id"], 4.0) == 4.0
+    assert doc["rating_sum"] == 4.0
+    assert doc["rating_count"] == 1
+
+def test_rerating_replaces_the_users_previous_rating(collection):
+    doc = _library_doc("guide", CREATED)
+    collection.docs = [doc]
+    alice, bob = _user(), _user()
+
+    _rate(alice, doc["_id"], 5.0)
+    _rate(bob, doc["_id"], 2.0)
+    first_rated_at = doc["ratings_map"][str(alice.id)]["created_at"]
+
+    assert _rate(alice, doc["_id"], 3.0) == 2.5
+    assert doc["rating_count"] == 2
+    assert doc["ratings_map"][str(alice.id)]["rating"] == 3.0
+    assert doc["ratings_map"][str(alice.id)]["created_at"] == first_rated_at
+
+def test_legacy_ratings_array_is_converted_on_the_next_rating(collection):
+    alice, bob, carol = _user(), _user(), _user()
+    doc = _library_doc("guide", CREATED, rating=4.0, ratings=[
+        {"user_id": str(alice.id), "rating": 5.0, "created_at": CREATED, "updated_at": CREATED},
+        {"user_id": str(bob.id), "rating": 3.0, "created_at": CREATED, "updated_at": CREATED}
+    ])
+    collection.docs = [doc]
+
+    assert _rate(carol, doc["_id"], 2.0) == pytest.approx(3.33)
+    assert "ratings" not in doc
+    assert set(doc["ratings_map"]) == {str(alice.id), str(bob.id), str(carol.id)}
+    assert doc["ratings_map"][str(alice.id)]["created_at"] == CREATED
+    assert (doc["rating_sum"], doc["rating_count"]) == (10.0, 3)
+
+    # A legacy rater updating keeps the count and swaps their old value out of the sum
+    assert _rate(bob, doc["_id"], 5.0) == 4.0
+    assert (doc["rating_sum"], doc["rating_count"]) == (12.0, 3)
+
+def test_full_library_queue_keeps_the_shutdown_sentinel(monkeypatch):
+    async def run():
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait(None)
+        monkeypatch.setattr(education, "start_library_writer", lambda: queue)
+        monkeypatch.setattr(education, "_content_library_doc", lambda content, user_id, topic: {"title": "guide"})
+        education._queue_library_save(None, "user", "misinformation")
+
+        assert queue.qsize() == 1
+        # The writer still sees the sentinel and returns instead of waiting forever
+        await asyncio.wait_for(education._run_library_writer(queue), timeout=1)
+    asyncio.run(run())
+
+def test_stopping_mid_flush_keeps_the_usage_counts(monkeypatch):
+    written = []
+    flush_started = asyncio.Event()
+
+    class UsageCollection:
+        async def bulk_write(self, operations, ordered=True):
+            if not flush_started.is_set():
+                flush_started.set()
+                await asyncio.Event().wait()  # Hangs until the flusher is cancelled
+            written.extend(operations)
+
+    async def get_database_operations():
+        return SimpleNamespace(db=SimpleNamespace(educational_content=UsageCollection()))
+
+    async def run():
+        monkeypatch.setattr(education, "get_database_operations", get_database_operations)
+        monkeypatch.setattr(education, "_usage_counts", education.Counter({"content-1": 3}))
+        finished_writer = asyncio.create_task(asyncio.sleep(0))
+        await finished_writer
+        monkeypatch.setattr(education, "_library_writer", finished_writer)
+        monkeypatch.setattr(education, "_usage_flusher", asyncio.create_task(education._flush_usage_counts()))
+        await flush_started.wait()
+
+        await education.stop_library_writer()
+
+        (operation,) = written
+        assert "'$inc': {'usage_count': 3}" in repr(operation)
+    asyncio.run(run())
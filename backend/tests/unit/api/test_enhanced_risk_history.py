@@ -0,0 +1,76 @@
+"""
+Enhanced risk history: keyset paging over assessments that share a created_at
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+# The router imports the local risk_detection package (packages/risk_detection)
+pytest.importorskip("risk_detection")
+
+from app.api.v1 import enhanced_risk
+from tests.fixtures.mongo import FakeCollection
+
+CREATED = datetime(2025, 9, 26, 15, 30)
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FakeCollection()
+    db_ops = SimpleNamespace(db=SimpleNamespace(enhanced_risk_assessments=collection))
+
+    async def get_database_operations():
+        return db_ops
+    monkeypatch.setattr(enhanced_risk, "get_database_operations", get_database_operations)
+    return collection
+
+def _user():
+    return SimpleNamespace(id=ObjectId(), role="user")
+
+def _assessment(user, score: int, created_at: datetime, severity: str = "medium"):
+    return {
+        "_id": ObjectId(),
+        "user_id": str(user.id),
+        "overall_risk_score": score,
+        "risk_severity": severity,
+        "created_at": created_at
+    }
+
+def _history_page(user, **params):
+    request = enhanced_risk.RiskHistoryRequest(limit=2, **params)
+    response = asyncio.run(enhanced_risk.get_risk_assessment_history(request, user))
+    return orjson.loads(response.body)
+
+def _all_pages(user, **params):
+    scores, keyset = [], {}
+    while page := _history_page(user, **params, **keyset):
+        scores += [item["overall_risk_score"] for item in page]
+        keyset = {"after": datetime.fromisoformat(page[-1]["created_at"]), "after_id": page[-1]["_id"]}
+    return scores
+
+def test_history_keyset_pages_through_assessments_sharing_a_timestamp(collection):
+    user = _user()
+    collection.docs = [_assessment(user, score, CREATED) for score in (10, 20, 30, 40)]
+    collection.docs.append(_assessment(user, 50, CREATED + timedelta(seconds=1)))
+    collection.docs.append(_assessment(_user(), 99, CREATED))
+
+    assert _all_pages(user) == [50, 40, 30, 20, 10]
+
+def test_history_keyset_keeps_the_severity_filter(collection):
+    user = _user()
+    collection.docs = [
+        _assessment(user, score, CREATED, "high" if score % 20 == 0 else "low")
+        for score in (10, 20, 30, 40, 60)
+    ]
+
+    assert _all_pages(user, severity_filter="HIGH") == [60, 40, 20]
+
+def test_history_rejects_a_malformed_after_id(collection):
+    with pytest.raises(HTTPException) as error:
+        _history_page(_user(), after=CREATED, after_id="not-an-id")
+    assert error.value.status_code == 400
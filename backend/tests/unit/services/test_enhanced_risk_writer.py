@@ -0,0 +1,38 @@
+"""
+Enhanced risk assessment writer: queued saves and shutdown
+"""
+
+import asyncio
+
+import pytest
+
+# The service imports the local risk_detection package (packages/risk_detection)
+pytest.importorskip("risk_detection")
+
+from app.services import enhanced_risk_detection
+from app.services.enhanced_risk_detection import EnhancedRiskResult, RiskSeverity, enhanced_risk_service
+
+def _result():
+    return EnhancedRiskResult(
+        overall_risk_score=12.5,
+        risk_severity=RiskSeverity.LOW,
+        risk_categories={},
+        hallucination_result=None,
+        adversarial_result=None,
+        mitigation_actions=[],
+        processing_safe=True,
+        requires_human_review=False,
+        metadata={}
+    )
+
+def test_full_assessment_queue_keeps_the_shutdown_sentinel(monkeypatch):
+    async def run():
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait(None)
+        monkeypatch.setattr(enhanced_risk_detection, "start_assessment_writer", lambda: queue)
+        await enhanced_risk_service._save_risk_assessment(_result(), "some content", "user-1")
+
+        assert queue.qsize() == 1
+        # The writer still sees the sentinel and returns instead of waiting forever
+        await asyncio.wait_for(enhanced_risk_detection._run_assessment_writer(queue), timeout=1)
+    asyncio.run(run())